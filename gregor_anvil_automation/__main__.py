@@ -18,6 +18,10 @@ from .utils.env import load_env_vars
 from . import __version__
 from .short_reads import validate
 from .utils.utils import parse_yaml
+from .utils.cache import DiskCache, get_cache_dir
+from .utils.readers import EXCEL_BACKENDS, TSV_BACKENDS
+from .validation.engines import ENGINES
+from .validation.schema import compile_schemas, load_schema_bundle
 
 
 logger = getLogger(__name__)
@@ -28,6 +32,24 @@ def main() -> int:
     args = command_line_parser()
     load_env_vars(args.env_file)
     config = parse_yaml(args.config_file)
+    if args.no_cache:
+        config.ingestion.use_cache = False
+    if args.incremental:
+        config.validation.incremental = True
+    if args.excel_backend:
+        config.ingestion.excel_backend = args.excel_backend
+    if args.tsv_backend:
+        config.ingestion.tsv_backend = args.tsv_backend
+    if args.typed_excel:
+        config.ingestion.typed_excel = True
+    if args.stage:
+        config.staging.enabled = True
+    if args.engine:
+        config.validation.engine = args.engine
+    if args.workers:
+        config.validation.workers = args.workers
+    if args.chunk_size:
+        config.validation.chunk_size = args.chunk_size
     name = f"{config.log_dir}/gregor_automation_{datetime.now()}.log"
     coloredlogs.install(
         filename=name,
@@ -35,6 +57,8 @@ def main() -> int:
         datefmt="%Y-%m-%d %H:%M:%S",
         level=INFO,
     )
+    if args.purge_cache:
+        DiskCache(get_cache_dir(config.ingestion.cache_dir)).purge()
     # Working Dir
     parent = environ.get("TMPDIR", None)  # From user or cluster
     with get_working_dir(config.get("working_dir"), parent=parent) as working_dir:
@@ -47,7 +71,19 @@ def run_command(config: addict.Dict, args, working_dir: Path) -> int:
     """Runs the command given by the user"""
     # TODO: This will be updated once we have validation/upload workflows established
     return_code = 0
-    if args.command == "short_reads":
+    if args.command == "compile_schemas":
+        logger.info("Compiling Schemas")
+        compile_schemas()
+        load_schema_bundle.cache_clear()
+    elif args.command == "short_reads" and args.keys_only:
+        logger.info("Running Short Read Key Validation")
+        return_code = validate.run_keys_only(
+            config,
+            args.input_path,
+            args.batch_number,
+            working_dir,
+        )
+    elif args.command == "short_reads":
         logger.info("Running Short Read Validation")
         return_code = validate.run(
             config,
@@ -68,13 +104,14 @@ def command_line_parser() -> Namespace:
     )
     parser.add_argument(
         "command",
-        choices=["short_reads", "long_reads"],
-        help="Specifies type of submission to exceute",
+        choices=["short_reads", "long_reads", "compile_schemas"],
+        help="Specifies type of submission to exceute, or compile_schemas to rebuild the compiled schema bundle",
     )
     parser.add_argument(
         "input_path",
+        nargs="?",
         type=Path,
-        help="Path to excel provided by the PM or path to directory containing TSVs",
+        help="Path to excel provided by the PM, path to directory containing TSVs or lims: to read from the LIMS",
     )
     parser.add_argument(
         "--config_file",
@@ -84,6 +121,7 @@ def command_line_parser() -> Namespace:
     )
     parser.add_argument(
         "batch_number",
+        nargs="?",
         type=int,
         help="batch_number is passed to help normalize data",
     )
@@ -93,7 +131,67 @@ def command_line_parser() -> Namespace:
         type=Path,
         help="Specifies the .env file to be used or assumes .env exist in current working directory",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Parses every input file without reading or writing the parsed input cache",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only validates the rows that changed since the last run of the same batch",
+    )
+    parser.add_argument(
+        "--purge_cache",
+        action="store_true",
+        help="Deletes every entry of the parsed input cache before running",
+    )
+    parser.add_argument(
+        "--excel_backend",
+        choices=EXCEL_BACKENDS,
+        help="Reader used for excel files, overrides ingestion.excel_backend",
+    )
+    parser.add_argument(
+        "--tsv_backend",
+        choices=TSV_BACKENDS,
+        help="Reader used for TSV files, overrides ingestion.tsv_backend",
+    )
+    parser.add_argument(
+        "--typed_excel",
+        action="store_true",
+        help="Formats excel numbers and dates from their cell values as the schemas declare",
+    )
+    parser.add_argument(
+        "--keys_only",
+        action="store_true",
+        help="Only checks the uniqueness and cross references of the key columns",
+    )
+    parser.add_argument(
+        "--stage",
+        action="store_true",
+        help="Copies the inputs to the working dir before parsing them",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        help="Engine validating the rows, overrides validation.engine",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of processes validating the rows, overrides validation.workers",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        help="Rows validated at a time by a worker, overrides validation.chunk_size",
+    )
+    args = parser.parse_args()
+    if args.command != "compile_schemas" and (
+        args.input_path is None or args.batch_number is None
+    ):
+        parser.error(f"{args.command} requires input_path and batch_number")
+    return args
 
 
 if __name__ == "__main__":
@@ -1,29 +1,60 @@
 from collections import defaultdict
+from heapq import merge
+from operator import itemgetter
 from pathlib import Path
 from dataclasses import asdict
 from logging import getLogger
+from typing import Any, Iterator, Optional
 
 from addict import Dict
-from gregor_anvil_automation.utils.mappings import REFERENCE_SOURCE
+from gregor_anvil_automation.utils.mappings import REFERENCE_SOURCE, TABLE_NAMES
 
 from gregor_anvil_automation.utils.utils import get_table_samples
-from ..utils.types import Sample, Table
+from ..utils.columnar import ColumnarTable
+from ..utils.types import Table, Tables
 from ..utils.issue import Issue
+from ..utils.row_index import RowIndex
 from ..utils.utils import generate_file
 from ..utils.email import send_email, ATTACHED_ISSUES_MSG_BODY, SUCCESS_MSG_BODY
-from ..validation.schema import get_schema
-from ..validation.sample import SampleValidator
-from ..validation.checks import check_cross_references, check_uniqueness
+from ..utils.cache import get_cache_dir
+from ..utils.staging import stage_and_compare
+from ..validation.incremental import ValidationResults, hash_row
+from ..validation.schema import get_schema, get_schema_hash
+from ..validation.engines import DEFAULT_ENGINE, get_sample_validator, validate_rows
+from ..validation.scheduler import schedule_tables
+from ..validation.sharded import (
+    DEFAULT_CHUNK_SIZE,
+    ShardedValidator,
+    get_validation_pool,
+)
+from ..validation.checks import (
+    check_cross_reference,
+    check_cross_references,
+    check_uniqueness,
+    get_key_columns,
+)
+from ..validation.intern import intern_table_values
+from ..validation.typed import format_typed_values
 from ..utils.mappings import HEADER_CASE_SENSITIVE_MAP
 
 
 logger = getLogger(__name__)
 
+SUBJECT = "GREGoR AnVIL automation"
+
 
 def run(config: Dict, input_path: Path, batch_number: str, working_dir: Path) -> int:
     """The short_reads entry point"""
+    if config.staging.enabled:
+        logger.info("Staging Inputs")
+        input_path = stage_and_compare(input_path, working_dir / "inputs", config)
     logger.info("Retrieving Table Samples")
-    tables = get_table_samples(input_path)
+    row_indexes = {}
+    tables = get_table_samples(input_path, config.ingestion, row_indexes)
+    for table_name, table in tables.items():
+        if config.ingestion.typed_excel:
+            format_typed_values(table_name, table)
+        intern_table_values(table_name, table)
     issues = []
     # Validate files
     logger.info("Validating Tables")
@@ -31,91 +62,290 @@ def run(config: Dict, input_path: Path, batch_number: str, working_dir: Path) ->
         batch_number=batch_number,
         issues=issues,
         tables=tables,
+        options=config.validation,
     )
 
     # If any errors, email issues in a csv file
-    subject = "GREGoR AnVIL automation"
     if issues:
-        file_path = working_dir / "issues.csv"
-        data_headers = ["field", "message", "table_name", "row"]
-        logger.info("Generating Issue Files")
-        generate_file(file_path, data_headers, [asdict(issue) for issue in issues], ",")
-        logger.info("Sending Issues Email")
-        send_email(config["email"], subject, ATTACHED_ISSUES_MSG_BODY, [file_path])
-        return 1
-    file_paths = []
+        return report_issues(config, issues, row_indexes, working_dir)
     logger.info("Generating Table Files")
+    file_paths = generate_table_files(tables, working_dir)
+    logger.info("Sending Table Files Email")
+    send_email(config["email"], SUBJECT, SUCCESS_MSG_BODY, file_paths)
+    return 0
+
+
+def run_keys_only(
+    config: Dict, input_path: Path, batch_number: str, working_dir: Path
+) -> int:
+    """Preflight that only checks the uniqueness and cross references of the
+    key columns of a submission. No other column is kept in memory."""
+    if config.staging.enabled:
+        logger.info("Staging Inputs")
+        input_path = stage_and_compare(input_path, working_dir / "inputs", config)
+    logger.info("Retrieving Key Columns of Table Samples")
+    row_indexes = {}
+    columns = {table_name: get_key_columns(table_name) for table_name in TABLE_NAMES}
+    tables = get_table_samples(input_path, config.ingestion, row_indexes, columns)
+    issues = []
+    logger.info("Validating Table Keys")
+    validate_table_keys(
+        batch_number=batch_number,
+        issues=issues,
+        tables=tables,
+        engine=config.validation.engine or DEFAULT_ENGINE,
+    )
+    if issues:
+        return report_issues(config, issues, row_indexes, working_dir)
+    logger.info("No Key Issues Found")
+    return 0
+
+
+def report_issues(
+    config: Dict,
+    issues: list[Issue],
+    row_indexes: dict[str, RowIndex],
+    working_dir: Path,
+) -> int:
+    """Emails the issues in a csv file"""
+    file_path = working_dir / "issues.csv"
+    data_headers = ["field", "message", "table_name", "row", "source_row"]
+    logger.info("Generating Issue Files")
+    generate_file(file_path, data_headers, get_issue_rows(issues, row_indexes), ",")
+    logger.info("Sending Issues Email")
+    send_email(config["email"], SUBJECT, ATTACHED_ISSUES_MSG_BODY, [file_path])
+    return 1
+
+
+def generate_table_files(tables: Tables, working_dir: Path) -> list[Path]:
+    """Generates a TSV of each table and returns their paths"""
+    file_paths = []
     for table_name, table in tables.items():
-        if table_name in HEADER_CASE_SENSITIVE_MAP:
-            for sample in table:
-                for old_header, new_header in HEADER_CASE_SENSITIVE_MAP[
-                    table_name
-                ].items():
-                    if old_header in sample:
-                        sample[new_header] = sample.pop(old_header)
-        # If all ok, generate tsvs of each table
+        for old_header, new_header in HEADER_CASE_SENSITIVE_MAP.get(
+            table_name, {}
+        ).items():
+            if old_header in table.header_index:
+                table.rename_column(old_header, new_header)
         file_path = working_dir / f"{table_name}.tsv"
-        data_headers = list(table[0].keys())
-        data_headers.remove("row_number")
-        generate_file(file_path, data_headers, table, "\t")
+        generate_file(file_path, table.headers, table, "\t")
         file_paths.append(file_path)
-    logger.info("Sending Table Files Email")
-    send_email(config["email"], subject, SUCCESS_MSG_BODY, file_paths)
-    return 0
+    return file_paths
 
 
-def validate_tables(batch_number: str, issues: list[Issue], tables: list[Table]):
-    """Validates tables via normalization and checking uniqueness of values across tables"""
+def validate_tables(
+    batch_number: str,
+    issues: list[Issue],
+    tables: Tables,
+    options: Optional[Dict] = None,
+):
+    """Validates tables via normalization and checking uniqueness of values across tables.
+    `options` are the `validation` options of the config:
+    - `incremental`: only the rows that changed since the last run of the
+      batch are validated again, their results are kept in `state_dir`
+    - `engine`: one of the `ENGINES`, see `validation.engines`
+    - `workers`: validates up to `workers` tables at a time, their rows in
+      chunks of `chunk_size` rows in a pool of worker processes, see
+      `validation.sharded`
+    The table wide checks only get the key columns of the normalized tables.
+    Each cross reference check runs as soon as its tables are validated, see
+    `validation.scheduler`."""
+    options = options or Dict()
+    engine = options.engine or DEFAULT_ENGINE
+    state_dir = None
+    if options.incremental:
+        state_dir = get_cache_dir(options.state_dir, "results")
     ids = defaultdict(set)
-    for table_name, samples in tables.items():
-        # Validate sample by sample using cerberus
-        logger.info("Normalizing and Validating Samples for Table %s", table_name)
-        samples = normalize_and_validate_samples(
-            batch_number=batch_number,
-            issues=issues,
-            samples=samples,
-            table_name=table_name,
-        )
-        # Validate Table Wide Issues which as of now is just unique checking
-        check_uniqueness(samples, table_name, issues)
-        if table_name in REFERENCE_SOURCE:
-            ids[REFERENCE_SOURCE[table_name]].update(
-                sample[REFERENCE_SOURCE[table_name]] for sample in samples
+    key_tables = {}
+    workers = options.workers or 1
+    with get_validation_pool(batch_number, engine, workers) as pool:
+
+        def validate_table(table_name: str) -> list[Issue]:
+            table_issues = []
+            results = None
+            if state_dir is not None:
+                results = ValidationResults(
+                    state_dir, batch_number, table_name, get_schema_hash(table_name)
+                )
+                results.load()
+            # Validate the samples with the engine
+            logger.info("Normalizing and Validating Samples for Table %s", table_name)
+            if pool is None:
+                sample_validator = get_sample_validator(
+                    get_schema(table_name), batch_number, engine
+                )
+            else:
+                sample_validator = ShardedValidator(
+                    pool, table_name, options.chunk_size or DEFAULT_CHUNK_SIZE
+                )
+            samples = normalize_and_validate_samples(
+                sample_validator=sample_validator,
+                issues=table_issues,
+                samples=tables[table_name],
+                table_name=table_name,
+                results=results,
             )
+            if results is not None:
+                results.save()
+            tables[table_name] = samples
+            key_tables[table_name] = samples.project(get_key_columns(table_name))
+            check_table_keys(key_tables[table_name], table_name, ids, table_issues)
+            return table_issues
+
+        def check_reference(reference: tuple[str, str, str]) -> list[Issue]:
+            table_name, _, foreign_key = reference
+            logger.info("Verifying Foreign Key %s of Table %s", foreign_key, table_name)
+            reference_issues = []
+            check_cross_reference(ids, key_tables, reference, reference_issues)
+            return reference_issues
+
+        issues.extend(
+            schedule_tables(list(tables), validate_table, check_reference, workers)
+        )
+
+
+def validate_table_keys(
+    batch_number: str, issues: list[Issue], tables: Tables, engine: str = DEFAULT_ENGINE
+):
+    """Validates the uniqueness and cross references of tables that only hold
+    their key columns. Only the key columns are normalized."""
+    ids = defaultdict(set)
+    for table_name, samples in tables.items():
+        logger.info("Normalizing Key Columns for Table %s", table_name)
+        samples = normalize_key_samples(batch_number, samples, table_name, engine)
         tables[table_name] = samples
-    # Cross Reference Checks
+        check_table_keys(samples, table_name, ids, issues)
     logger.info("Verifying Primary Table Foreign Key Existence")
     check_cross_references(ids, tables, issues)
 
 
-def normalize_and_validate_samples(
-    batch_number: str,
-    issues: list[dict],
-    samples: list[Sample],
-    table_name: str,
+def check_table_keys(
+    samples: Table, table_name: str, ids: defaultdict, issues: list[Issue]
 ):
-    """Normalizes and validate samples"""
-    logger.info("Retreiving Schema")
+    """Validates table wide issues, which as of now is just unique checking,
+    and collects the primary keys of the table for the cross reference checks"""
+    check_uniqueness(samples, table_name, issues)
+    if table_name in REFERENCE_SOURCE:
+        ids[REFERENCE_SOURCE[table_name]].update(
+            sample[REFERENCE_SOURCE[table_name]] for sample in samples
+        )
+
+
+def normalize_key_samples(
+    batch_number: str, samples: Table, table_name: str, engine: str = DEFAULT_ENGINE
+) -> Table:
+    """Normalizes the columns of a table that only holds its key columns,
+    without validating them"""
     schema = get_schema(table_name)
-    sample_validator = SampleValidator(
-        schema=schema,
-        batch_number=batch_number,
+    sample_validator = get_sample_validator(
+        {
+            field: rules
+            for field, rules in schema.items()
+            if field in samples.header_index
+        },
+        batch_number,
+        engine,
     )
-    sample_validator.allow_unknown = True
-    normalized_samples = []
+    normalized_samples = ColumnarTable()
     for sample in samples:
-        sample_validator.validate(sample)
-        normalized_samples.append(sample_validator.document)
+        normalized_samples.append(
+            sample_validator.normalized(sample, always_return_document=True)
+        )
+    return normalized_samples
+
+
+def normalize_and_validate_samples(
+    sample_validator: Any,
+    issues: list[dict],
+    samples: Table,
+    table_name: str,
+    results: Optional[ValidationResults] = None,
+) -> Table:
+    """Normalizes and validate samples with the validator of the table, see
+    `get_sample_validator` and `validate_samples`"""
+    normalized_samples = ColumnarTable()
+    for sample, (document, errors) in zip(
+        samples, validate_samples(sample_validator, samples, results)
+    ):
+        normalized_samples.append(document)
         issues.extend(
             convert_errors_to_issues(
-                errors=sample_validator.errors,
+                errors=errors,
                 table_name=table_name,
                 row=sample["row_number"],
             )
         )
+    if results is not None:
+        logger.info(
+            "Reused %s of %s Validated Rows for Table %s",
+            results.reused,
+            len(normalized_samples),
+            table_name,
+        )
+    intern_table_values(table_name, normalized_samples)
     return normalized_samples
 
 
+def validate_samples(
+    sample_validator: Any,
+    samples: Table,
+    results: Optional[ValidationResults] = None,
+) -> Iterator[tuple[dict, dict]]:
+    """Yields the normalized document and errors of every sample. Rows found
+    in `results` reuse their previous document and errors instead of being
+    validated. A `ColumnwiseValidator` validates the other rows a column at a
+    time, so each distinct value of a column is only validated once. Results
+    are yielded in the order of the samples."""
+    row_hashes, reused = [], {}
+    if results is not None:
+        row_hashes = [hash_row(sample) for sample in samples]
+        for index, row_hash in enumerate(row_hashes):
+            if (result := results.get(row_hash)) is not None:
+                reused[index] = result
+    pending = [index for index in range(len(samples)) if index not in reused]
+    validated = zip(
+        pending, validate_rows(sample_validator, take_rows(samples, pending))
+    )
+    reused_rows = (
+        (index, ({**document, "row_number": samples[index]["row_number"]}, errors))
+        for index, (document, errors) in reused.items()
+    )
+    for index, (document, errors) in merge(reused_rows, validated, key=itemgetter(0)):
+        if results is not None and index not in reused:
+            results.add(row_hashes[index], document, errors)
+        yield document, errors
+
+
+def take_rows(samples: Table, indexes: list[int]) -> Table:
+    """Returns the rows of a table at the given indexes"""
+    if len(indexes) == len(samples):
+        return samples
+    if isinstance(samples, ColumnarTable):
+        return samples.take(indexes)
+    return [samples[index] for index in indexes]
+
+
+def get_issue_rows(issues: list[Issue], row_indexes: dict[str, RowIndex]) -> list[dict]:
+    """Converts issues to rows of the issues file. Each row gets the source text
+    of the row the issue is about, which is only read from the input files for
+    the rows that actually have issues."""
+    wanted_rows = defaultdict(set)
+    for issue in issues:
+        if issue.row is not None and issue.table_name in row_indexes:
+            wanted_rows[issue.table_name].add(issue.row)
+    source_rows = {
+        table_name: row_indexes[table_name].get_rows(row_numbers)
+        for table_name, row_numbers in wanted_rows.items()
+    }
+    issue_rows = []
+    for issue in issues:
+        issue_row = asdict(issue)
+        issue_row["source_row"] = source_rows.get(issue.table_name, {}).get(
+            issue.row, ""
+        )
+        issue_rows.append(issue_row)
+    return issue_rows
+
+
 def convert_errors_to_issues(errors: list[dict], **kwargs) -> list[dict[str, str]]:
     """Convers from Cerberus errors to a dictionary of issues. We use the
     biobank_id, lims_id, and sample_id since a manifest is guaranteed to have
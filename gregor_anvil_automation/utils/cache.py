@@ -0,0 +1,94 @@
+"""
+On disk caches. Parsed input files are pickled under a key made of the name,
+size and content hash of the input file plus the parser version, so a rerun on
+unchanged inputs skips parsing them entirely, wherever the inputs are read
+from, e.g. a staged copy.
+"""
+
+import hashlib
+import os
+import pickle
+from logging import getLogger
+from os import environ
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Optional
+
+from ..__version__ import __version__
+
+logger = getLogger(__name__)
+
+# Bump whenever a change to the parsing code changes the parsed tables
+PARSER_VERSION = 4
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_cache_dir(cache_dir: Optional[str] = None, name: str = "inputs") -> Path:
+    """Returns the given cache directory or the user's default one for `name`"""
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    cache_home = environ.get("XDG_CACHE_HOME") or "~/.cache"
+    return Path(cache_home).expanduser() / "gregor_anvil_automation" / name
+
+
+def fingerprint_file(file_path: Path) -> tuple[int, str]:
+    """Returns the size and sha256 digest of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as fin:
+        while chunk := fin.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return file_path.stat().st_size, digest.hexdigest()
+
+
+class DiskCache:
+    """Pickled values stored in a cache directory"""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def get_file_key(self, file_path: Path, *parse_options: Any) -> str:
+        """Returns the key of a file parsed with the given options. Only the
+        name and content of the file matter, not the directory it is in."""
+        size, digest = fingerprint_file(file_path)
+        parts = (
+            file_path.name,
+            size,
+            digest,
+            PARSER_VERSION,
+            __version__,
+            *parse_options,
+        )
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[Any]:
+        """Returns the cached value or None if there is no usable entry"""
+        try:
+            with open(self.cache_dir / f"{key}.pickle", "rb") as fin:
+                return pickle.load(fin)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+            logger.warning("Ignoring Unreadable Cache Entry %s", key)
+            return None
+
+    def store(self, key: str, value: Any) -> None:
+        """Stores a value. The entry is written under a temporary name first so
+        concurrent runs never read a partial entry."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(
+                "wb", dir=self.cache_dir, suffix=".tmp", delete=False
+            ) as fout:
+                pickle.dump(value, fout, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(fout.name, self.cache_dir / f"{key}.pickle")
+        except OSError:
+            logger.warning("Unable to Write Cache Entry %s", key, exc_info=True)
+
+    def purge(self) -> None:
+        """Deletes every entry of the cache"""
+        logger.info("Purging Cache %s", self.cache_dir)
+        for entry in self.cache_dir.glob("*.pickle"):
+            entry.unlink(missing_ok=True)
+        for entry in self.cache_dir.glob("*.tmp"):
+            entry.unlink(missing_ok=True)
@@ -0,0 +1,187 @@
+"""
+Columnar storage for tables. Every column is a single list shared by all rows
+and the header names are only stored once, in the table's header index, instead
+of being repeated as keys of a dict per row.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+from typing import Any, Optional, Union
+
+
+class Missing:
+    """Marks a value that is not present in a row, which is not the same as
+    None. Unpickles as `MISSING`, so tables sent to other processes or read
+    from the cache keep their missing values."""
+
+    __slots__ = ()
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = Missing()
+
+
+class RowView(MutableMapping):
+    """A row of a `ColumnarTable` that behaves like the `Sample` dict it
+    replaces. Reads and writes go straight to the columns of the table."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "ColumnarTable", index: int) -> None:
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "row_number":
+            return self.table.row_numbers[self.index]
+        value = self.table.columns[self.table.header_index[key]][self.index]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "row_number":
+            self.table.row_numbers[self.index] = value
+            return
+        if key not in self.table.header_index:
+            self.table.add_column(key)
+        self.table.columns[self.table.header_index[key]][self.index] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key == "row_number" or self.get(key, MISSING) is MISSING:
+            raise KeyError(key)
+        self.table.columns[self.table.header_index[key]][self.index] = MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        for header, column in zip(self.table.header_index, self.table.columns):
+            if column[self.index] is not MISSING:
+                yield header
+        yield "row_number"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __copy__(self) -> dict[str, Any]:
+        # Cerberus copies the document it validates; the copy must not write
+        # back into the table
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)})"
+
+
+class ColumnarTable(Sequence):
+    """A table stored as one list per column plus an array of row numbers.
+    Indexing and iterating give `RowView`s, so code written for a list of
+    `Sample` dicts keeps working."""
+
+    def __init__(self, headers: Iterable[str] = ()) -> None:
+        self.header_index: dict[str, int] = {}
+        self.columns: list[list] = []
+        self.row_numbers = array("q")
+        for header in headers:
+            self.add_column(header)
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[Mapping]) -> "ColumnarTable":
+        """Builds a table from `Sample` dicts"""
+        table = cls()
+        for sample in samples:
+            table.append(sample)
+        return table
+
+    @property
+    def headers(self) -> list[str]:
+        """The column names, without `row_number`"""
+        return list(self.header_index)
+
+    def add_column(self, header: str, column: Optional[list] = None) -> None:
+        """Adds a column, by default missing from every existing row"""
+        if header in self.header_index:
+            raise ValueError(f"Column {header} already exists")
+        self.header_index[header] = len(self.columns)
+        self.columns.append(
+            [MISSING] * len(self.row_numbers) if column is None else column
+        )
+
+    def rename_column(self, old_header: str, new_header: str) -> None:
+        """Renames a column in place, keeping its position"""
+        if new_header in self.header_index:
+            raise ValueError(f"Column {new_header} already exists")
+        self.header_index = {
+            new_header if header == old_header else header: idx
+            for header, idx in self.header_index.items()
+        }
+
+    def project(self, headers: Iterable[str]) -> "ColumnarTable":
+        """Returns a table of only the given columns, sharing their values with
+        this table. Headers the table does not have are ignored."""
+        table = ColumnarTable()
+        for header in headers:
+            if header in self.header_index and header not in table.header_index:
+                table.add_column(header, self.column(header))
+        table.row_numbers = array("q", self.row_numbers)
+        return table
+
+    def take(self, indexes: Iterable[int]) -> "ColumnarTable":
+        """Returns a table of the rows at the given indexes, with the same
+        columns in the same order"""
+        table = ColumnarTable(self.header_index)
+        for index in indexes:
+            table.append_row(
+                [column[index] for column in self.columns], self.row_numbers[index]
+            )
+        return table
+
+    def column(self, header: str) -> list:
+        """Returns the values of a column. Missing values are `MISSING`."""
+        return self.columns[self.header_index[header]]
+
+    def append(self, sample: Mapping) -> None:
+        """Appends a `Sample`, adding any column the table does not have yet"""
+        for header in sample:
+            if header != "row_number" and header not in self.header_index:
+                self.add_column(header)
+        for header, column in zip(self.header_index, self.columns):
+            column.append(sample.get(header, MISSING))
+        self.row_numbers.append(sample["row_number"])
+
+    def append_row(self, values: Sequence, row_number: int) -> None:
+        """Appends the values of a row given in the order of the columns. The
+        columns after the given values are missing from the row."""
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        for column in self.columns[len(values) :]:
+            column.append(MISSING)
+        self.row_numbers.append(row_number)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[RowView, list[RowView]]:
+        if isinstance(index, slice):
+            return [RowView(self, idx) for idx in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("table index out of range")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        for index in range(len(self)):
+            yield RowView(self, index)
+
+    def __len__(self) -> int:
+        return len(self.row_numbers)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            row == sample for row, sample in zip(self, other)
+        )
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable({[dict(row) for row in self]})"
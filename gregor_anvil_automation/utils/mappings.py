@@ -339,8 +339,25 @@ MULTI_FIELD_MAP = {
 }
 
 
-#########
-#########
+###############
+# TABLE NAMES #
+###############
+
+TABLE_NAMES = {
+    "aligned_dna_short_read",
+    "aligned_nanopore",
+    "aligned_rna_short_read",
+    "analyte",
+    "experiment_dna_short_read",
+    "experiment_nanopore",
+    "experiment_rna_short_read",
+    "family",
+    "genetic_findings",
+    "participant",
+    "phenotype",
+}
+
+# Sheet name used by the PMs : table name
 TABLE_NAME_MAPPINGS = {
     "AlignedNanopore": "aligned_nanopore",
     "ExptNanopore": "experiment_nanopore",
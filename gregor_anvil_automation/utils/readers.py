@@ -0,0 +1,296 @@
+"""
+Reader backends of input files. An excel backend opens a workbook and streams
+the rows of its sheets as tuples of cell values, normalized to the values
+openpyxl gives, so the samples read from a workbook are the same whichever
+backend reads it. The TSV backends read delimited text into a `ColumnarTable`,
+either with the `csv` module or with Arrow's multithreaded CSV reader.
+The calamine and Arrow backends are much faster on large inputs and are used
+whenever their package is installed (`pip install gregor_anvil_automation[fast]`).
+"""
+
+import csv
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional, Union
+from xml.etree import ElementTree
+from zipfile import BadZipFile, ZipFile
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import coordinate_to_tuple
+
+from .columnar import ColumnarTable
+
+try:
+    import python_calamine
+except ImportError:  # pragma: no cover - depends on the installed extras
+    python_calamine = None
+
+try:
+    import pyarrow
+    from pyarrow import csv as arrow_csv
+except ImportError:  # pragma: no cover - depends on the installed extras
+    pyarrow = None
+
+# Excel stores numbers as doubles and only writes integral ones below this
+# without an exponent, which openpyxl then reads back as ints
+MAX_EXACT_INT = 1e15
+
+# Text that only appears in the XML of a sheet that has error cells
+ERROR_CELL_MARKER = b't="e"'
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+OFFICE_RELATIONSHIPS = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+)
+
+
+class OpenpyxlReader:
+    """Reads a workbook with openpyxl in read-only mode"""
+
+    name = "openpyxl"
+
+    def __init__(self, input_file: Union[Path, BinaryIO]) -> None:
+        self.workbook = load_workbook(input_file, read_only=True, data_only=True)
+
+    @property
+    def sheet_names(self) -> list[str]:
+        """The names of the worksheets, in workbook order"""
+        return [sheet.title for sheet in self.workbook.worksheets]
+
+    @property
+    def active_sheet_name(self) -> str:
+        """The name of the sheet the workbook opens on"""
+        return self.workbook.active.title
+
+    def iter_rows(self, sheet_name: str) -> Iterator[tuple]:
+        """Yields the cell values of every row of a sheet, starting at row 1"""
+        return self.workbook[sheet_name].iter_rows(values_only=True)
+
+    def close(self) -> None:
+        """Closes the workbook"""
+        self.workbook.close()
+
+
+class CalamineReader:
+    """Reads a workbook with calamine. Calamine reads error cells, e.g. #N/A,
+    as empty strings, so their error text is read from the sheet XML, which is
+    only parsed when it has error cells."""
+
+    name = "calamine"
+
+    def __init__(self, input_file: Union[Path, BinaryIO]) -> None:
+        if python_calamine is None:
+            raise ImportError(
+                "The calamine excel backend requires the python-calamine package"
+            )
+        self.input_file = input_file
+        if isinstance(input_file, Path):
+            self.workbook = python_calamine.CalamineWorkbook.from_path(str(input_file))
+        else:
+            self.workbook = python_calamine.CalamineWorkbook.from_filelike(input_file)
+
+    @property
+    def sheet_names(self) -> list[str]:
+        """The names of the worksheets, in workbook order"""
+        return [
+            sheet.name
+            for sheet in self.workbook.sheets_metadata
+            if sheet.typ == python_calamine.SheetTypeEnum.WorkSheet
+        ]
+
+    @property
+    def active_sheet_name(self) -> str:
+        """The name of the sheet the workbook opens on. Calamine does not
+        expose it, so it is read from the workbook view of the archive."""
+        return self.workbook.sheet_names[get_active_sheet_index(self.input_file)]
+
+    def iter_rows(self, sheet_name: str) -> Iterator[tuple]:
+        """Yields the cell values of every row of a sheet, starting at row 1"""
+        sheet = self.workbook.get_sheet_by_name(sheet_name)
+        # Rows are given from row 1 but columns only from the first used one
+        padding = (None,) * sheet.start[1] if sheet.height else ()
+        error_cells = get_error_cells(self.input_file, sheet_name)
+        for row_idx, row in enumerate(sheet.iter_rows(), 1):
+            values = padding + tuple(to_openpyxl_value(value) for value in row)
+            if row_idx in error_cells:
+                errors = error_cells[row_idx]
+                values = tuple(
+                    errors.get(column, value) for column, value in enumerate(values, 1)
+                )
+            yield values
+
+    def close(self) -> None:
+        """Closes the workbook"""
+        self.workbook.close()
+
+
+EXCEL_READERS = {
+    OpenpyxlReader.name: OpenpyxlReader,
+    CalamineReader.name: CalamineReader,
+}
+
+EXCEL_BACKENDS = ["auto", *EXCEL_READERS]
+
+
+def get_excel_reader(backend: str = "auto") -> type:
+    """Returns the reader class of an excel backend. `auto` picks calamine when
+    it is installed and openpyxl otherwise."""
+    if backend == "auto":
+        return CalamineReader if python_calamine is not None else OpenpyxlReader
+    if backend not in EXCEL_READERS:
+        raise ValueError(
+            f"Unknown excel backend {backend}, expected one of {EXCEL_BACKENDS}"
+        )
+    return EXCEL_READERS[backend]
+
+
+def get_available_excel_backends() -> list[str]:
+    """Returns the excel backends that can be used with the installed packages"""
+    return [
+        name
+        for name in EXCEL_READERS
+        if name != CalamineReader.name or python_calamine is not None
+    ]
+
+
+def to_openpyxl_value(value: Any) -> Any:
+    """Converts a cell value read by calamine to the one openpyxl reads"""
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer() and abs(value) < MAX_EXACT_INT:
+        return int(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    return value
+
+
+def get_active_sheet_index(input_file: Union[Path, BinaryIO]) -> int:
+    """Returns the index of the active sheet of an xlsx archive"""
+    if not isinstance(input_file, Path):
+        input_file.seek(0)
+    try:
+        with ZipFile(input_file) as archive:
+            root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    except (KeyError, BadZipFile, ElementTree.ParseError):
+        return 0
+    for element in root.iter():
+        if element.tag.endswith("}workbookView") or element.tag == "workbookView":
+            return int(element.get("activeTab", 0))
+    return 0
+
+
+def get_error_cells(
+    input_file: Union[Path, BinaryIO], sheet_name: str
+) -> dict[int, dict[int, str]]:
+    """Returns the error text of the error cells of a sheet of an xlsx
+    archive, by row and column, both starting at 1"""
+    if not isinstance(input_file, Path):
+        input_file.seek(0)
+    error_cells = {}
+    try:
+        with ZipFile(input_file) as archive:
+            sheet_path = get_sheet_paths(archive).get(sheet_name)
+            if sheet_path is None or not has_error_cells(archive, sheet_path):
+                return error_cells
+            with archive.open(sheet_path) as sheet:
+                for _, element in ElementTree.iterparse(sheet):
+                    tag = element.tag.rpartition("}")[2]
+                    if tag == "c" and element.get("t") == "e" and element.get("r"):
+                        row, column = coordinate_to_tuple(element.get("r"))
+                        text = element.findtext("{*}v")
+                        error_cells.setdefault(row, {})[column] = text
+                    elif tag == "row":
+                        element.clear()
+    except (KeyError, BadZipFile, ElementTree.ParseError):
+        return {}
+    return error_cells
+
+
+def get_sheet_paths(archive: ZipFile) -> dict[str, str]:
+    """Returns the path of the XML of every sheet of an xlsx archive by name"""
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    relationships = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {
+        element.get("Id"): element.get("Target")
+        for element in relationships.iter()
+        if element.get("Id") and element.get("Target")
+    }
+    sheet_paths = {}
+    for element in workbook.iter():
+        if element.tag.rpartition("}")[2] != "sheet":
+            continue
+        target = targets.get(element.get(f"{{{OFFICE_RELATIONSHIPS}}}id"), "")
+        sheet_paths[element.get("name")] = (
+            target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        )
+    return sheet_paths
+
+
+def has_error_cells(archive: ZipFile, sheet_path: str) -> bool:
+    """Returns True if the XML of a sheet has error cells, without parsing it"""
+    tail = b""
+    with archive.open(sheet_path) as sheet:
+        while chunk := sheet.read(READ_CHUNK_SIZE):
+            if ERROR_CELL_MARKER in tail + chunk:
+                return True
+            tail = chunk[-len(ERROR_CELL_MARKER) :]
+    return False
+
+
+TSV_BACKENDS = ["auto", "python", "arrow"]
+
+
+def get_tsv_backend(backend: str = "auto") -> str:
+    """Returns the TSV backend to use. `auto` picks arrow when pyarrow is
+    installed and python otherwise."""
+    if backend == "auto":
+        return "arrow" if pyarrow is not None else "python"
+    if backend not in TSV_BACKENDS:
+        raise ValueError(
+            f"Unknown TSV backend {backend}, expected one of {TSV_BACKENDS}"
+        )
+    if backend == "arrow" and pyarrow is None:
+        raise ImportError("The arrow TSV backend requires the pyarrow package")
+    return backend
+
+
+def read_table_arrow(
+    fin: BinaryIO, delimiter: str, newlines_in_values: bool = True
+) -> Optional[ColumnarTable]:
+    """Reads delimited text with Arrow's CSV reader, which parses blocks of the
+    text on all cores. Every value is kept as the exact string of the file:
+    there is no type inference and neither empty strings nor "NA" become null.
+    Returns None for text that only `read_table` reads the same way as
+    `csv.DictReader`, i.e. with duplicate headers or rows that do not have a
+    value for every header. `newlines_in_values` can be turned off when the
+    text has no quotes, which lets Arrow split the text more freely."""
+    header_line = fin.readline()
+    if not header_line:
+        return ColumnarTable()
+    if b'"' in header_line:
+        return None
+    headers = next(csv.reader([header_line.decode("utf-8")], delimiter=delimiter))
+    if not headers or len(set(headers)) != len(headers):
+        return None
+    try:
+        table = arrow_csv.read_csv(
+            fin,
+            read_options=arrow_csv.ReadOptions(column_names=headers, use_threads=True),
+            parse_options=arrow_csv.ParseOptions(
+                delimiter=delimiter, newlines_in_values=newlines_in_values
+            ),
+            convert_options=arrow_csv.ConvertOptions(
+                column_types=dict.fromkeys(headers, pyarrow.string()),
+                null_values=[],
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+    except pyarrow.ArrowInvalid:
+        return None
+    columnar = ColumnarTable()
+    for header, column in zip(headers, table.columns):
+        columnar.add_column(header, column.to_pylist())
+    columnar.row_numbers.extend(range(2, table.num_rows + 2))
+    return columnar
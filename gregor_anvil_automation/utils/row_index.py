@@ -0,0 +1,82 @@
+"""
+Byte offset index of the rows of a delimited source file. Only the offsets are
+kept in memory; the original text of a row is read back through a memory map
+when it is needed, e.g. for the rows that have issues.
+"""
+
+import csv
+import mmap
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+
+@dataclass
+class RowIndex:
+    """Maps the `row_number` of a parsed file to the byte range of its source
+    text. `offsets[i]` is where row `i + 2` starts and the last offset is the
+    end of the file."""
+
+    file_path: Path
+    offsets: array = field(default_factory=lambda: array("Q"))
+
+    def get_rows(self, row_numbers: Iterable[int]) -> dict[int, str]:
+        """Returns the source text of the given rows, reading only those rows"""
+        wanted = sorted(
+            {
+                row_number
+                for row_number in row_numbers
+                if 0 <= row_number - 2 < len(self.offsets) - 1
+            }
+        )
+        if not wanted:
+            return {}
+        rows = {}
+        with open(self.file_path, "rb") as fin, mmap.mmap(
+            fin.fileno(), 0, access=mmap.ACCESS_READ
+        ) as source:
+            for row_number in wanted:
+                start, end = self.offsets[row_number - 2], self.offsets[row_number - 1]
+                rows[row_number] = source[start:end].decode("utf-8").strip("\r\n")
+        return rows
+
+
+class OffsetLines:
+    """Iterates the decoded lines of a binary file while keeping track of the
+    byte position of the next line"""
+
+    def __init__(self, fin: BinaryIO) -> None:
+        self.fin = fin
+        self.position = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.fin:
+            self.position += len(line)
+            yield line.decode("utf-8")
+
+
+def index_rows(
+    fin: BinaryIO, delimiter: str, row_index: RowIndex, quoted: bool = True
+) -> None:
+    """Records the offsets of the rows of a delimited binary file the way
+    `read_table` does, without keeping their values. Without quotes in the
+    file, a row is simply a line that is not blank, so the file is only split
+    into lines instead of being parsed."""
+    if quoted:
+        lines = OffsetLines(fin)
+        reader = csv.reader(lines, delimiter=delimiter)
+        next(reader, None)
+        start = lines.position
+        for row in reader:
+            if row:
+                row_index.offsets.append(start)
+            start = lines.position
+    else:
+        start = len(fin.readline())
+        for line in fin:
+            if line.strip(b"\r\n"):
+                row_index.offsets.append(start)
+            start += len(line)
+    if row_index.offsets:
+        row_index.offsets.append(start)
@@ -0,0 +1,126 @@
+"""
+Staging of inputs from slow shared storage. The input files are copied to the
+local working dir with large sequential reads, which network and clustered
+file systems serve far better than the small random reads of parsers, e.g.
+openpyxl seeking inside a workbook. Every copy is checked against the checksum
+of the bytes read from the original.
+"""
+
+import hashlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter
+
+import addict
+
+from .cache import fingerprint_file
+from .lims import is_lims_input
+from .utils import get_table_samples, is_input_name
+
+logger = getLogger(__name__)
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+WORKERS = 4
+
+
+def stage_inputs(
+    input_path: Path,
+    staging_dir: Path,
+    workers: int = WORKERS,
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple[Path, float]:
+    """Copies the input file, or the input files of the input directory, to the
+    staging dir with `workers` parallel copies. Returns the path to parse
+    instead of `input_path` and the seconds the copies took."""
+    if is_lims_input(input_path):
+        return input_path, 0.0
+    if input_path.is_dir():
+        files = sorted(
+            file
+            for file in input_path.iterdir()
+            if file.is_file() and is_input_name(file.name)
+        )
+        staged_path = staging_dir
+    else:
+        files = [input_path]
+        staged_path = staging_dir / input_path.name
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        sizes = list(
+            executor.map(
+                lambda file: copy_verified(file, staging_dir / file.name, chunk_size),
+                files,
+            )
+        )
+    seconds = perf_counter() - start
+    logger.info(
+        "Staged %s Files (%s Bytes) to %s in %.2fs",
+        len(files),
+        sum(sizes),
+        staging_dir,
+        seconds,
+    )
+    return staged_path, seconds
+
+
+def copy_verified(source: Path, destination: Path, chunk_size: int = CHUNK_SIZE) -> int:
+    """Copies a file in `chunk_size` sequential reads and checks the copy
+    against the checksum of what was read. Returns the size of the file."""
+    digest = hashlib.sha256()
+    with open(source, "rb", buffering=0) as fin, open(destination, "wb") as fout:
+        while chunk := fin.read(chunk_size):
+            digest.update(chunk)
+            fout.write(chunk)
+    shutil.copystat(source, destination)
+    size, copy_digest = fingerprint_file(destination)
+    if copy_digest != digest.hexdigest():
+        raise StagingError(source, destination)
+    return size
+
+
+def stage_and_compare(input_path: Path, staging_dir: Path, config: addict.Dict) -> Path:
+    """Stages the inputs as the `staging` section of the config says. With
+    `staging.compare`, the original and the staged inputs are also parsed,
+    without the cache, and the time staging saves over direct reads is logged."""
+    staged_path, copy_seconds = stage_inputs(
+        input_path,
+        staging_dir,
+        config.staging.workers or WORKERS,
+        (config.staging.chunk_size_mb or CHUNK_SIZE // 1024**2) * 1024**2,
+    )
+    if config.staging.compare:
+        options = addict.Dict(config.ingestion)
+        options.use_cache = False
+        direct_seconds = time_parse(input_path, options)
+        staged_seconds = time_parse(staged_path, options)
+        logger.info(
+            "Staging Saved %.2fs: Direct Parse %.2fs, Copy %.2fs, Staged Parse %.2fs",
+            direct_seconds - copy_seconds - staged_seconds,
+            direct_seconds,
+            copy_seconds,
+            staged_seconds,
+        )
+    return staged_path
+
+
+def time_parse(input_path: Path, options: addict.Dict) -> float:
+    """Returns the seconds it takes to parse the inputs"""
+    start = perf_counter()
+    get_table_samples(input_path, options)
+    return perf_counter() - start
+
+
+#############
+# Exception #
+#############
+@dataclass
+class StagingError(Exception):
+    """Raised when a staged copy does not match its original"""
+
+    source: Path
+    destination: Path
@@ -1,3 +1,5 @@
+from .columnar import ColumnarTable
+
 Sample = dict[str, str]
-Table = list[Sample]
+Table = ColumnarTable
 Tables = dict[str, Table]
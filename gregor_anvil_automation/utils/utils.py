@@ -1,68 +1,505 @@
-from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path, PurePath, PurePosixPath
+from zipfile import ZipFile
 import csv
+import gzip
+import io
+import mmap
 from logging import getLogger
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping, Optional, Union
 
 import addict
 import yaml
-from openpyxl import Workbook, load_workbook
-
 
+from .cache import DiskCache, fingerprint_file, get_cache_dir
+from .columnar import ColumnarTable
 from .exceptions import InputPathDoesNotExistError
-from .types import Sample
+from .lims import get_table_samples_by_lims, is_lims_input
+from .mappings import TABLE_NAME_MAPPINGS, TABLE_NAMES
+from .readers import get_excel_reader, get_tsv_backend, read_table_arrow
+from .row_index import OffsetLines, RowIndex, index_rows
+from .types import Sample, Table, Tables
+from .vcf import (
+    DEFAULT_VCF_COLUMNS,
+    VCF_TABLE_NAME,
+    InvalidVCF,
+    check_vcf_columns,
+    iter_vcf_samples,
+)
 
 
 logger = getLogger(__name__)
 
 
-def get_table_samples(input_path: Path) -> dict[str, list[Sample]]:
-    """Get tables from either an excel path or directory filled with TSVs"""
+# Number of consecutive empty rows after which a sheet is considered done. PM
+# templates carry formatting down to the last row Excel allows, so the declared
+# dimension of a sheet says nothing about where the data actually ends.
+MAX_EMPTY_ROWS = 100
+
+# Input formats : precedence when several files hold the same table
+INPUT_FORMATS = {
+    ".tsv": 0,
+    ".tsv.gz": 1,
+    ".tsv.bgz": 1,
+    ".xlsx": 2,
+    ".zip": 3,
+    ".vcf": 4,
+    ".vcf.gz": 5,
+    ".vcf.bgz": 5,
+}
+
+GZIP_FORMATS = {".tsv.gz", ".tsv.bgz", ".vcf.gz", ".vcf.bgz"}
+
+VCF_FORMATS = {".vcf", ".vcf.gz", ".vcf.bgz"}
+
+
+@dataclass(frozen=True)
+class ReadOptions:
+    """How input files are read"""
+
+    max_empty_rows: int = MAX_EMPTY_ROWS
+    excel_backend: str = "auto"
+    tsv_backend: str = "auto"
+    typed_excel: bool = False
+    vcf_columns: tuple[tuple[str, str], ...] = tuple(DEFAULT_VCF_COLUMNS.items())
+    vcf_sample: Optional[str] = None
+    vcf_table_name: str = VCF_TABLE_NAME
+
+    @classmethod
+    def from_config(cls, options: addict.Dict) -> "ReadOptions":
+        """Builds the options from the `ingestion` section of the config. The
+        `auto` backends are resolved to the backends that will be used."""
+        return cls(
+            max_empty_rows=options.max_empty_rows or MAX_EMPTY_ROWS,
+            excel_backend=get_excel_reader(options.excel_backend or "auto").name,
+            tsv_backend=get_tsv_backend(options.tsv_backend or "auto"),
+            typed_excel=bool(options.typed_excel),
+            vcf_columns=tuple(
+                {**DEFAULT_VCF_COLUMNS, **(options.vcf.columns or {})}.items()
+            ),
+            vcf_sample=options.vcf.sample or None,
+            vcf_table_name=options.vcf.table_name or VCF_TABLE_NAME,
+        )
+
+
+def get_table_samples(
+    input_path: Path,
+    options: Optional[addict.Dict] = None,
+    row_indexes: Optional[dict[str, RowIndex]] = None,
+    columns: Optional[Mapping[str, Iterable[str]]] = None,
+) -> Tables:
+    """Get tables from either an input file (excel, TSV, gzipped TSV or a zip
+    archive of those), a directory of input files or the LIMS database when
+    `input_path` is `lims:`. `options` is the
+    `ingestion` section of the config. When `row_indexes` is given, it is filled
+    with the `RowIndex` of every table read from a plain TSV. When `columns` is
+    given, only those columns of each table are kept, see `project_tables`."""
+    options = options or addict.Dict()
+    if is_lims_input(input_path):
+        logger.info("Retrieving Table Samples Via LIMS")
+        tables = get_table_samples_by_lims(options.lims)
+        return tables if columns is None else project_tables(tables, columns)
     if not input_path.exists():
         raise InputPathDoesNotExistError(input_path)
-    if ".xlsx" in input_path.suffixes:
-        logger.info("Retrieving Tables Samples Via Excel")
-        return get_table_samples_by_excel(input_path)
+    read_options = ReadOptions.from_config(options)
+    cache_dir = None
+    if options.get("use_cache", True):
+        cache_dir = get_cache_dir(options.cache_dir)
+    parse = partial(
+        parse_input_file,
+        read_options=read_options,
+        cache_dir=cache_dir,
+        columns=columns,
+    )
     if input_path.is_dir():
         logger.info("Retrieving Table Samples Via Directory")
-        return get_table_samples_by_directory(input_path)
+        return get_table_samples_by_directory(
+            input_path, parse, options.workers or 1, row_indexes
+        )
+    if get_input_format(input_path.name):
+        logger.info("Retrieving Table Samples Via File")
+        tables, indexes = parse(input_path)
+        if row_indexes is not None:
+            row_indexes.update(indexes)
+        return tables
     raise NotImplementedError
 
 
-def get_table_samples_by_directory(dir_path: Path) -> dict[str, list[Sample]]:
-    """Gets every TSV file in the directory."""
-    data = {}
-    for file in dir_path.glob("*"):
-        if "xlsx" in file.suffix and "~" not in file.name:
-            data[file.stem] = get_table_samples_by_excel(file)
-        if "tsv" in file.suffix:
-            print(file)
-            data[file.stem] = parse_file(file, "\t")
+def get_table_samples_by_directory(
+    dir_path: Path,
+    parse: Optional[Callable[[Path], tuple[Tables, dict[str, RowIndex]]]] = None,
+    workers: int = 1,
+    row_indexes: Optional[dict[str, RowIndex]] = None,
+) -> Tables:
+    """Gets every TSV and excel file in the directory. Files are parsed with
+    `parse`, by default `parse_input_file` with its default options, by a pool of
+    `workers` processes and merged in file name order, so the result does not
+    depend on which file finishes first. Any projection of the columns is done
+    by the workers, so only the requested columns are sent back."""
+    parse = parse or parse_input_file
+    files = get_input_files(dir_path)
+    if workers > 1 and len(files) > 1:
+        logger.info("Parsing %s Files With %s Workers", len(files), workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse, files))
+    else:
+        results = [parse(file) for file in files]
+    data, sources = {}, {}
+    for file, (tables, indexes) in zip(files, results):
+        for table_name in add_tables(data, tables, file.name, sources):
+            if row_indexes is not None and table_name in indexes:
+                row_indexes[table_name] = indexes[table_name]
     return data
 
 
-def get_table_samples_by_excel(input_file: Path) -> dict[str, list[Sample]]:
-    """Reads the given excel file path and gets the samples"""
-    workbook: Workbook = load_workbook(input_file)
-    sheet = workbook.active
-    max_column = sheet.max_column
-    samples = []
-    headers = []
-    for i in range(1, max_column + 1):
-        if header := sheet.cell(row=1, column=i).value:
-            headers.append(header.strip().lower().replace(" ", "_"))
-    for row_cells in sheet.iter_rows(min_row=2):
-        if all(cell.value is None or cell.value.strip() == "" for cell in row_cells):
+def add_tables(
+    data: Tables, tables: Tables, source: str, sources: dict[str, str]
+) -> list[str]:
+    """Adds the tables read from `source` that were not read yet. `sources`
+    holds the source each table of `data` was first read from. Every VCF is
+    read as the same table, so the table of a VCF is appended to the one read
+    from the VCFs before it, with its rows numbered after theirs. A table read
+    from both VCFs and other files is refused. Returns the names of the added
+    tables, appended tables have no row index and are not among them."""
+    added = []
+    for table_name, samples in tables.items():
+        if table_name in data:
+            first_source = sources[table_name]
+            if is_vcf_name(source) and is_vcf_name(first_source):
+                logger.info("Appending Table %s From %s", table_name, source)
+                append_table(data[table_name], samples)
+            elif is_vcf_name(source) or is_vcf_name(first_source):
+                raise InvalidVCF(
+                    f"Table {table_name} can not be read from both {first_source}"
+                    f" and {source}, only VCFs are read into the same table"
+                )
+            else:
+                logger.warning(
+                    "Skipping Table %s From %s Since It Was Already Read",
+                    table_name,
+                    source,
+                )
             continue
-        sample = {
-            header: (
-                ""
-                if row_cells[idx].value is None
-                else str(row_cells[idx].value).strip()
+        data[table_name] = samples
+        sources[table_name] = source
+        added.append(table_name)
+    return added
+
+
+def append_table(table: Table, samples: Table) -> None:
+    """Appends the samples to a table, numbering their rows after its rows"""
+    offset = table.row_numbers[-1] if table else 0
+    for sample in samples:
+        table.append({**sample, "row_number": sample["row_number"] + offset})
+
+
+def get_input_files(dir_path: Path) -> list[Path]:
+    """Returns the parsable files of the directory in a deterministic order.
+    The same table sent twice is only returned once: byte identical files are
+    detected by their fingerprint, and among files named after the same table
+    the cheapest one to parse wins (TSV, then gzipped TSV, then excel, ...)."""
+    files = sorted(
+        (file for file in dir_path.glob("*") if is_input_name(file.name)),
+        key=get_input_order,
+    )
+    sizes = Counter(file.stat().st_size for file in files)
+    input_files = []
+    stems = set()
+    fingerprints = {}
+    for file in files:
+        stem = get_input_stem(file.name)
+        if stem in stems:
+            logger.warning("Skipping %s Since Table %s Was Given", file, stem)
+            continue
+        # Only files of the same size can be identical, so hash just those
+        if sizes[file.stat().st_size] > 1:
+            fingerprint = fingerprint_file(file)
+            if fingerprint in fingerprints:
+                logger.warning(
+                    "Skipping %s Since It Is A Duplicate Of %s",
+                    file,
+                    fingerprints[fingerprint],
+                )
+                continue
+            fingerprints[fingerprint] = file
+        stems.add(stem)
+        input_files.append(file)
+    return input_files
+
+
+def get_input_format(name: str) -> Optional[str]:
+    """Returns the input format (one of `INPUT_FORMATS`) of a file name"""
+    for input_format in INPUT_FORMATS:
+        if name.lower().endswith(input_format):
+            return input_format
+    return None
+
+
+def get_input_stem(name: str) -> str:
+    """Returns the file name without its input format suffix, which is the
+    name of the table the file holds"""
+    input_format = get_input_format(name)
+    return name[: -len(input_format)] if input_format else name
+
+
+def is_vcf_name(name: str) -> bool:
+    """Returns True for the name of a VCF, gzipped or not"""
+    return get_input_format(name) in VCF_FORMATS
+
+
+def is_input_name(name: str) -> bool:
+    """Returns True for the name of a file that can be parsed. Lock files of
+    excel and resource forks of macOS archives are not input files."""
+    return bool(get_input_format(name)) and "~" not in name and not name.startswith(".")
+
+
+def get_input_order(file_path: PurePath) -> tuple[str, int, str]:
+    """Sort key of input files: by table, then cheapest format first"""
+    return (
+        get_input_stem(file_path.name),
+        INPUT_FORMATS[get_input_format(file_path.name)],
+        file_path.name,
+    )
+
+
+def parse_input_file(
+    file_path: Path,
+    read_options: ReadOptions = ReadOptions(),
+    cache_dir: Optional[Path] = None,
+    columns: Optional[Mapping[str, Iterable[str]]] = None,
+) -> tuple[Tables, dict[str, RowIndex]]:
+    """Parses a single TSV or excel input file into its tables, along with the
+    row index of the tables read from a TSV. When a `cache_dir` is given, the
+    parsed file is read from or written to the parsed input cache, which always
+    holds every column. When `columns` is given, the tables are projected."""
+    if cache_dir is None:
+        parsed = parse_uncached_input_file(file_path, read_options)
+    else:
+        cache = DiskCache(cache_dir)
+        key = cache.get_file_key(file_path, read_options)
+        if (parsed := cache.load(key)) is not None:
+            logger.info("Using Cached Tables of %s", file_path)
+            # The cached file may have been read from another directory
+            for row_index in parsed[1].values():
+                row_index.file_path = file_path
+        else:
+            parsed = parse_uncached_input_file(file_path, read_options)
+            cache.store(key, parsed)
+    if columns is None:
+        return parsed
+    tables, row_indexes = parsed
+    return project_tables(tables, columns), row_indexes
+
+
+def project_tables(tables: Tables, columns: Mapping[str, Iterable[str]]) -> Tables:
+    """Keeps only the given columns of each table, by table name. Tables that
+    are not in `columns` keep no column at all, only their row numbers."""
+    return {
+        table_name: table.project(columns.get(table_name, ()))
+        for table_name, table in tables.items()
+    }
+
+
+def parse_uncached_input_file(
+    file_path: Path, read_options: ReadOptions = ReadOptions()
+) -> tuple[Tables, dict[str, RowIndex]]:
+    """Parses a single input file, see `parse_input_file`"""
+    input_format = get_input_format(file_path.name)
+    if input_format == ".tsv":
+        table_name = get_input_stem(file_path.name)
+        row_index = RowIndex(file_path)
+        table = parse_file(
+            file_path, "\t", row_index, get_tsv_backend(read_options.tsv_backend)
+        )
+        return {table_name: table}, {table_name: row_index}
+    if input_format == ".zip":
+        return get_table_samples_by_zip(file_path, read_options), {}
+    with open(file_path, "rb") as fin:
+        return parse_input_stream(fin, file_path.name, read_options), {}
+
+
+def parse_input_stream(
+    stream: BinaryIO, name: str, read_options: ReadOptions = ReadOptions()
+) -> Tables:
+    """Parses an excel, TSV, VCF or gzipped TSV or VCF input from a binary
+    stream. Gzipped inputs, including bgzip ones, are decompressed while they
+    are read. A VCF is read as the `vcf_table_name` table, one record at a
+    time."""
+    input_format = get_input_format(name)
+    table_name = get_input_stem(name)
+    if input_format == ".xlsx":
+        return get_table_samples_by_workbook(stream, read_options, table_name)
+    if input_format in GZIP_FORMATS:
+        stream = gzip.open(stream)
+    if input_format in VCF_FORMATS:
+        vcf_columns = dict(read_options.vcf_columns)
+        check_vcf_columns(vcf_columns, read_options.vcf_table_name)
+        with io.TextIOWrapper(stream, encoding="utf-8") as fin:
+            samples = iter_vcf_samples(fin, vcf_columns, read_options.vcf_sample)
+            return {read_options.vcf_table_name: ColumnarTable.from_samples(samples)}
+    if get_tsv_backend(read_options.tsv_backend) == "arrow":
+        if (table := read_table_arrow(stream, "\t")) is not None:
+            return {table_name: table}
+        stream.seek(0)
+    with io.TextIOWrapper(stream, encoding="utf-8") as fin:
+        return {table_name: read_table(fin, "\t")}
+
+
+def get_table_samples_by_zip(
+    zip_path: Path, read_options: ReadOptions = ReadOptions()
+) -> Tables:
+    """Reads the input files inside a zip archive without extracting them.
+    Tables are named after the members, in the same order and with the same
+    precedence as the files of a directory."""
+    tables, sources = {}, {}
+    with ZipFile(zip_path) as archive:
+        members = sorted(
+            (
+                PurePosixPath(info.filename)
+                for info in archive.infolist()
+                if not info.is_dir()
+                and is_input_name(PurePosixPath(info.filename).name)
+            ),
+            key=get_input_order,
+        )
+        for member in members:
+            if get_input_format(member.name) == ".zip":
+                logger.warning("Skipping Nested Archive %s", member)
+                continue
+            logger.info("Reading %s From %s", member, zip_path.name)
+            with archive.open(str(member)) as stream:
+                if get_input_format(member.name) == ".xlsx":
+                    # Excel readers seek all over the workbook, which is slow
+                    # on a compressed member, so read it into memory first
+                    stream = io.BytesIO(stream.read())
+                member_tables = parse_input_stream(stream, member.name, read_options)
+            add_tables(tables, member_tables, str(member), sources)
+    return tables
+
+
+def get_table_samples_by_excel(
+    input_file: Path, read_options: ReadOptions = ReadOptions()
+) -> Table:
+    """Reads the active sheet of the given excel file path and gets the samples"""
+    reader = get_excel_reader(read_options.excel_backend)(input_file)
+    try:
+        return ColumnarTable.from_samples(
+            iter_sheet_samples(
+                reader.iter_rows(reader.active_sheet_name),
+                read_options.max_empty_rows,
+                read_options.typed_excel,
+            )
+        )
+    finally:
+        reader.close()
+
+
+def get_table_samples_by_workbook(
+    input_file: Union[Path, BinaryIO],
+    read_options: ReadOptions = ReadOptions(),
+    default_table_name: Optional[str] = None,
+) -> Tables:
+    """Reads every sheet of the given excel file in a single pass. Each sheet is
+    routed to its table through `TABLE_NAME_MAPPINGS`, so the workbook is only
+    decompressed and its shared strings parsed once for the whole submission.
+    A workbook without any recognized sheet is treated as a single table named
+    after the file (or `default_table_name`), using its active sheet."""
+    reader = get_excel_reader(read_options.excel_backend)(input_file)
+    tables = {}
+    try:
+        for sheet_name in reader.sheet_names:
+            table_name = get_table_name(sheet_name)
+            if table_name is None:
+                logger.warning("Skipping Sheet %s Without A Known Table", sheet_name)
+                continue
+            if table_name in tables:
+                logger.warning(
+                    "Skipping Sheet %s Since Table %s Was Already Read",
+                    sheet_name,
+                    table_name,
+                )
+                continue
+            logger.info("Reading Sheet %s As Table %s", sheet_name, table_name)
+            tables[table_name] = ColumnarTable.from_samples(
+                iter_sheet_samples(
+                    reader.iter_rows(sheet_name),
+                    read_options.max_empty_rows,
+                    read_options.typed_excel,
+                )
             )
-            for idx, header in enumerate(headers)
+        if not tables:
+            tables[default_table_name or input_file.stem] = ColumnarTable.from_samples(
+                iter_sheet_samples(
+                    reader.iter_rows(reader.active_sheet_name),
+                    read_options.max_empty_rows,
+                    read_options.typed_excel,
+                )
+            )
+    finally:
+        reader.close()
+    return tables
+
+
+def get_table_name(sheet_name: str) -> Optional[str]:
+    """Returns the table name for a sheet name, either via `TABLE_NAME_MAPPINGS`
+    or because the sheet is already named after a table."""
+    sheet_name = sheet_name.strip()
+    if sheet_name in TABLE_NAME_MAPPINGS:
+        return TABLE_NAME_MAPPINGS[sheet_name]
+    table_name = sheet_name.lower().replace(" ", "_")
+    return table_name if table_name in TABLE_NAMES else None
+
+
+def iter_sheet_samples(
+    rows: Iterable[tuple], max_empty_rows: int = MAX_EMPTY_ROWS, typed: bool = False
+) -> Iterator[Sample]:
+    """Lazily yields the samples of the rows of a sheet, as given by an excel
+    reader. The first row holds the headers. Empty rows are skipped, and reading
+    stops after `max_empty_rows` consecutive empty rows so memory and time only
+    depend on the real data extent of the sheet, not its declared dimension.
+    When `typed`, numbers and dates are kept as the native values of the cells
+    for `format_typed_values` to format."""
+    convert = cell_to_value if typed else cell_to_str
+    rows = iter(rows)
+    headers = [
+        (idx, str(header).strip().lower().replace(" ", "_"))
+        for idx, header in enumerate(next(rows, ()))
+        if not is_empty_cell(header)
+    ]
+    empty_rows = 0
+    for row_number, values in enumerate(rows, 2):
+        if all(is_empty_cell(value) for value in values):
+            empty_rows += 1
+            if empty_rows >= max_empty_rows:
+                break
+            continue
+        empty_rows = 0
+        sample = {
+            header: convert(values[idx] if idx < len(values) else None)
+            for idx, header in headers
         }
-        sample["row_number"] = row_cells[0].row
-        samples.append(sample)
-    return samples
+        sample["row_number"] = row_number
+        yield sample
+
+
+def is_empty_cell(value: Any) -> bool:
+    """Returns True if the cell value is missing or only white space"""
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def cell_to_str(value: Any) -> str:
+    """Converts a cell value to the stripped string used in a `Sample`"""
+    return "" if value is None else str(value).strip()
+
+
+def cell_to_value(value: Any) -> Any:
+    """Converts a cell value to a stripped string, unless it is not text"""
+    if value is None or isinstance(value, str):
+        return cell_to_str(value)
+    return value
 
 
 def parse_yaml(yaml_path: Path) -> addict.Dict:
@@ -71,19 +508,82 @@ def parse_yaml(yaml_path: Path) -> addict.Dict:
         return addict.Dict(yaml.safe_load(fin.read()))
 
 
-def parse_file(file_path: Path, delimiter: str) -> addict.Dict:
-    """Parses a file"""
-    data = []
-    with open(file_path, "r", encoding="utf-8") as fin:
-        reader = csv.DictReader(fin, delimiter=delimiter)
-        for idx, line in enumerate(reader, 2):
-            line["row_number"] = idx
-            data.append(line)
-    return data
+def parse_file(
+    file_path: Path,
+    delimiter: str,
+    row_index: Optional[RowIndex] = None,
+    tsv_backend: str = "python",
+) -> Table:
+    """Parses a file. When a `row_index` is given, the byte offset of every row
+    is recorded in it so the source rows can be fetched later on. The arrow
+    `tsv_backend` falls back to `read_table` for files it cannot read the same."""
+    if tsv_backend == "arrow":
+        if (table := parse_file_arrow(file_path, delimiter, row_index)) is not None:
+            return table
+    if row_index is None:
+        with open(file_path, "r", encoding="utf-8") as fin:
+            return read_table(fin, delimiter)
+    with open(file_path, "rb") as fin:
+        return read_table(OffsetLines(fin), delimiter, row_index)
+
+
+def parse_file_arrow(
+    file_path: Path, delimiter: str, row_index: Optional[RowIndex] = None
+) -> Optional[Table]:
+    """Parses a file with `read_table_arrow`, then indexes its rows if a
+    `row_index` is given. Returns None if Arrow cannot read the file."""
+    if not file_path.stat().st_size:
+        return None
+    with open(file_path, "rb") as fin:
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            quoted = source.find(b'"') != -1
+        table = read_table_arrow(fin, delimiter, newlines_in_values=quoted)
+        if table is not None and row_index is not None:
+            fin.seek(0)
+            index_rows(fin, delimiter, row_index, quoted)
+    return table
+
+
+def read_table(
+    lines: Iterable[str], delimiter: str, row_index: Optional[RowIndex] = None
+) -> Table:
+    """Reads delimited lines straight into a columnar table. The samples are the
+    same as the ones `csv.DictReader` gives: blank lines are skipped, missing
+    values are None and extra values are listed under the None header. When a
+    `row_index` is given, `lines` must be `OffsetLines`."""
+    reader = csv.reader(lines, delimiter=delimiter)
+    headers = next(reader, None)
+    if headers is None:
+        return ColumnarTable()
+    # Rows can only go straight into the columns if every header has its own
+    regular_width = len(headers) if len(set(headers)) == len(headers) else None
+    table = ColumnarTable(dict.fromkeys(headers))
+    start = lines.position if row_index is not None else None
+    row_number = 2
+    for row in reader:
+        if row:
+            if len(row) == regular_width:
+                table.append_row(row, row_number)
+            else:
+                sample = dict(zip(headers, row))
+                if len(row) > len(headers):
+                    sample[None] = row[len(headers) :]
+                for header in headers[len(row) :]:
+                    sample[header] = None
+                sample["row_number"] = row_number
+                table.append(sample)
+            if row_index is not None:
+                row_index.offsets.append(start)
+            row_number += 1
+        if row_index is not None:
+            start = lines.position
+    if row_index is not None and table:
+        row_index.offsets.append(start)
+    return table
 
 
 def generate_file(
-    file_path: Path, data_headers: list[str], data: list[dict[str, str]], delimiter: str
+    file_path: Path, data_headers: list[str], data: Iterable[Mapping], delimiter: str
 ):
     """Generates either a csv or tsv file depending on the passed in delimiter"""
     with open(file_path, "w", encoding="utf-8") as file:
@@ -0,0 +1,290 @@
+"""
+Reads genetic findings from VCFs. Records are streamed one line at a time and
+each becomes a sample whose columns are taken from the record through a
+mapping of column name to source:
+
+- `CHROM`, `POS`, `ID`, `REF`, `ALT`, `QUAL` or `FILTER`: a fixed field, the
+  chromosome without its `chr` prefix and with `M` read as `MT`
+- `INFO/<key>`: an INFO value, `true` for a flag that is set
+- `FORMAT/<key>`: a FORMAT value of the sample
+- `SAMPLE`: the name of the sample
+- `ZYGOSITY`: the zygosity of the genotype (GT) of the sample
+- `VARIANT_TYPE`: SNV, INDEL or SV, from the REF and ALT alleles
+- `ASSEMBLY`: the reference assembly named by the `##reference` or `##contig`
+  header lines
+- `FINDING_ID`: the sample, chromosome, position, REF and ALT joined by `_`
+- `=<text>`: the text itself, e.g. `=GRCh38`
+
+Missing values (`.`) are read as empty strings. Records where the sample only
+has reference alleles (e.g. `0/0`) are not findings and are skipped.
+"""
+
+from typing import Callable, Iterable, Iterator, Mapping, Optional
+
+from .types import Sample
+
+# Column name : source, the config adds to or replaces these
+DEFAULT_VCF_COLUMNS = {
+    "genetic_findings_id": "FINDING_ID",
+    "participant_id": "SAMPLE",
+    "variant_type": "VARIANT_TYPE",
+    "variant_reference_assembly": "ASSEMBLY",
+    "chrom": "CHROM",
+    "pos": "POS",
+    "ref": "REF",
+    "alt": "ALT",
+    "zygosity": "ZYGOSITY",
+}
+
+VCF_TABLE_NAME = "genetic_findings"
+
+# Required columns of the genetic_findings table, experiment_id and
+# gene_known_for_phenotype can only come from the config
+REQUIRED_VCF_COLUMNS = [
+    "genetic_findings_id",
+    "participant_id",
+    "experiment_id",
+    "variant_type",
+    "variant_reference_assembly",
+    "ref",
+    "alt",
+    "zygosity",
+    "gene_known_for_phenotype",
+]
+
+# Assembly : names of it found in the header lines, in lower case
+ASSEMBLY_NAMES = {
+    "GRCh38": ("grch38", "hg38"),
+    "CHM13": ("chm13", "t2t"),
+    "GRCh37": ("grch37", "hg19"),
+}
+
+FIXED_FIELDS = ["CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER"]
+
+INFO_FIELD = 7
+FORMAT_FIELD = 8
+
+
+class VCFRecord:
+    """The INFO and FORMAT values of a record, only split when asked for"""
+
+    __slots__ = ("fields", "sample_index", "_info", "_format")
+
+    def __init__(self, fields: list[str], sample_index: Optional[int]) -> None:
+        self.fields = fields
+        self.sample_index = sample_index
+        self._info = None
+        self._format = None
+
+    @property
+    def info(self) -> dict[str, str]:
+        """The INFO values by key"""
+        if self._info is None:
+            self._info = {}
+            if len(self.fields) > INFO_FIELD and self.fields[INFO_FIELD] != ".":
+                for entry in self.fields[INFO_FIELD].split(";"):
+                    key, _, value = entry.partition("=")
+                    self._info[key] = value if value else "true"
+        return self._info
+
+    def field(self, index: int) -> str:
+        """Returns a field of the record, empty when the record is too short"""
+        return self.fields[index] if index < len(self.fields) else ""
+
+    @property
+    def is_reference(self) -> bool:
+        """True when the genotype of the sample only has reference alleles"""
+        alleles = self.format.get("GT", "").replace("|", "/").split("/")
+        return set(alleles) == {"0"}
+
+    @property
+    def format(self) -> dict[str, str]:
+        """The FORMAT values of the sample by key"""
+        if self._format is None:
+            self._format = {}
+            if self.sample_index is not None and self.sample_index < len(self.fields):
+                keys = self.fields[FORMAT_FIELD].split(":")
+                values = self.fields[self.sample_index].split(":")
+                self._format = dict(zip(keys, values))
+        return self._format
+
+
+def iter_vcf_samples(
+    lines: Iterable[str],
+    columns: Optional[Mapping[str, str]] = None,
+    sample_name: Optional[str] = None,
+) -> Iterator[Sample]:
+    """Lazily yields a sample for every record of a VCF, see the module
+    docstring for the `columns` mapping. FORMAT values come from the sample
+    named `sample_name`, by default the first one. The `row_number` of a
+    sample is the line number of its record."""
+    columns = columns or DEFAULT_VCF_COLUMNS
+    getters, sample_index, assembly = None, None, None
+    for line_number, line in enumerate(lines, 1):
+        if line.startswith("##"):
+            assembly = assembly or get_assembly(line)
+            continue
+        if not line.strip():
+            continue
+        fields = line.rstrip("\r\n").split("\t")
+        if line.startswith("#"):
+            getters, sample_index = get_getters(columns, fields, sample_name, assembly)
+            continue
+        if getters is None:
+            raise InvalidVCF(f"Record before the header line at line {line_number}")
+        record = VCFRecord(fields, sample_index)
+        if record.is_reference:
+            continue
+        sample = {column: clean_value(getter(record)) for column, getter in getters}
+        sample["row_number"] = line_number
+        yield sample
+
+
+def check_vcf_columns(columns: Mapping[str, str], table_name: str) -> None:
+    """Raises `InvalidVCF` unless the columns read from a VCF give every
+    required column of the genetic_findings table"""
+    if table_name != VCF_TABLE_NAME:
+        return
+    missing = [column for column in REQUIRED_VCF_COLUMNS if column not in columns]
+    if missing:
+        raise InvalidVCF(
+            f"The VCF columns of the config must give {', '.join(missing)}"
+            f" of {table_name}"
+        )
+
+
+def get_assembly(line: str) -> Optional[str]:
+    """Returns the assembly named by a `##reference` or `##contig` header line"""
+    if not line.startswith(("##reference=", "##contig=")):
+        return None
+    line = line.lower()
+    for assembly, names in ASSEMBLY_NAMES.items():
+        if any(name in line for name in names):
+            return assembly
+    return None
+
+
+def get_getters(
+    columns: Mapping[str, str],
+    header: list[str],
+    sample_name: Optional[str],
+    assembly: Optional[str] = None,
+) -> tuple[list[tuple[str, Callable]], Optional[int]]:
+    """Returns the getter of each column for the records under a VCF header
+    line, along with the index of the field of the sample"""
+    sample_names = header[FORMAT_FIELD + 1 :]
+    if sample_name is not None and sample_name not in sample_names:
+        raise InvalidVCF(f"Sample {sample_name} is not in the VCF")
+    sample_index = None
+    if sample_names:
+        sample_name = sample_name or sample_names[0]
+        sample_index = FORMAT_FIELD + 1 + sample_names.index(sample_name)
+    getters = [
+        (column, get_getter(source, sample_name, assembly))
+        for column, source in columns.items()
+    ]
+    return getters, sample_index
+
+
+# Source : getter, for the sources only read from the record itself
+RECORD_GETTERS = {
+    "CHROM": lambda record: normalize_chrom(record.field(0)),
+    "ZYGOSITY": lambda record: get_zygosity(record.format.get("GT", "")),
+    "VARIANT_TYPE": lambda record: get_variant_type(record.field(3), record.field(4)),
+}
+
+
+def get_getter(
+    source: str, sample_name: Optional[str], assembly: Optional[str] = None
+) -> Callable:
+    """Returns the function reading a source from a `VCFRecord`"""
+    if source.startswith("="):
+        text = source[1:]
+        return lambda record: text
+    if source in RECORD_GETTERS:
+        return RECORD_GETTERS[source]
+    if source in FIXED_FIELDS:
+        index = FIXED_FIELDS.index(source)
+        return lambda record: record.field(index)
+    if source.startswith("INFO/"):
+        key = source[len("INFO/") :]
+        return lambda record: record.info.get(key, "")
+    if source.startswith("FORMAT/"):
+        key = source[len("FORMAT/") :]
+        return lambda record: record.format.get(key, "")
+    return get_header_getter(source, sample_name or "", assembly)
+
+
+def get_header_getter(
+    source: str, sample_name: str, assembly: Optional[str]
+) -> Callable:
+    """Returns the function reading a source that depends on the header lines"""
+    if source == "SAMPLE":
+        return lambda record: sample_name
+    if source == "FINDING_ID":
+        return lambda record: get_finding_id(record, sample_name)
+    if source != "ASSEMBLY":
+        raise InvalidVCF(f"Unknown VCF source {source}")
+    if assembly is None:
+        raise InvalidVCF(
+            "The VCF header does not name its reference assembly, map"
+            " variant_reference_assembly to it in the config, e.g. =GRCh38"
+        )
+    return lambda record: assembly
+
+
+def get_finding_id(record: VCFRecord, sample_name: str) -> str:
+    """Returns an ID of the finding of a record in a sample"""
+    return "_".join(
+        [
+            sample_name,
+            normalize_chrom(record.field(0)),
+            record.field(1),
+            record.field(3),
+            record.field(4),
+        ]
+    )
+
+
+def normalize_chrom(chrom: str) -> str:
+    """Returns a chromosome as genetic_findings has it, e.g. MT for chrM"""
+    if chrom[:3].lower() == "chr":
+        chrom = chrom[3:]
+    return "MT" if chrom.upper() == "M" else chrom
+
+
+def get_zygosity(genotype: str) -> str:
+    """Returns the zygosity of a genotype, e.g. Heterozygous for 0/1. Genotypes
+    of only reference alleles, e.g. 0/0, are Reference."""
+    alleles = genotype.replace("|", "/").split("/")
+    if not genotype or "." in alleles:
+        return "Unknown"
+    if set(alleles) == {"0"}:
+        return "Reference"
+    if len(alleles) == 1:
+        return "Hemizygous"
+    return "Homozygous" if len(set(alleles)) == 1 else "Heterozygous"
+
+
+def get_variant_type(ref: str, alt: str) -> str:
+    """Returns SV for symbolic and breakend alleles, SNV when every allele is
+    as long as the reference and INDEL otherwise"""
+    alleles = alt.split(",")
+    if any(allele[:1] == "<" or "[" in allele or "]" in allele for allele in alleles):
+        return "SV"
+    if all(len(allele) == len(ref) for allele in alleles):
+        return "SNV"
+    return "INDEL"
+
+
+def clean_value(value: str) -> str:
+    """Reads the VCF missing value as an empty string"""
+    value = value.strip()
+    return "" if value == "." else value
+
+
+#############
+# Exception #
+#############
+class InvalidVCF(Exception):
+    """Raised when a VCF or its column mapping can not be read"""
@@ -5,11 +5,23 @@ from logging import getLogger
 
 from gregor_anvil_automation.utils.issue import Issue
 from ..utils.types import Sample, Table
-from ..utils.mappings import CROSS_REF_CHECK, UNIQUE_MAPPING
+from ..utils.mappings import CROSS_REF_CHECK, REFERENCE_SOURCE, UNIQUE_MAPPING
 
 logger = getLogger(__name__)
 
 
+def get_key_columns(table_name: str) -> list[str]:
+    """Returns the columns of a table that the cross table checks read: its
+    unique fields, its primary key and its foreign keys"""
+    columns = dict.fromkeys(UNIQUE_MAPPING.get(table_name, []))
+    if table_name in REFERENCE_SOURCE:
+        columns[REFERENCE_SOURCE[table_name]] = None
+    for ref_table_name, _, dest_field in CROSS_REF_CHECK:
+        if ref_table_name == table_name:
+            columns[dest_field] = None
+    return list(columns)
+
+
 def check_uniqueness(samples: list[Sample], table_name: str, issues: list[Issue]):
     """Checks if the given list of values is unique"""
     fields_to_check = UNIQUE_MAPPING.get(table_name)
@@ -52,23 +64,35 @@ def check_value_exist_in_source(field_name: str, table: Table, table_source: Tab
 
 def check_cross_references(ids: defaultdict, tables: list[Table], issues: list[Issue]):
     """Checks all the foreign keys exist in the primary table"""
-    for table_name, source_field, dest_field in CROSS_REF_CHECK:
-        if table_name not in tables:
-            continue
+    for reference in CROSS_REF_CHECK:
+        check_cross_reference(ids, tables, reference, issues)
+
+
+def check_cross_reference(
+    ids: defaultdict,
+    tables: list[Table],
+    reference: tuple[str, str, str],
+    issues: list[Issue],
+):
+    """Checks the foreign keys of a `CROSS_REF_CHECK` entry exist in the
+    primary table"""
+    table_name, source_field, dest_field = reference
+    if table_name not in tables:
+        return
 
-        missing_values = set()
-        for sample in tables[table_name]:
-            values = sample[dest_field].split("|")
-            for value in values:
-                if value.lower() != "na" and value not in ids[source_field]:
-                    missing_values.add(value)
+    missing_values = set()
+    for sample in tables[table_name]:
+        values = sample[dest_field].split("|")
+        for value in values:
+            if value.lower() != "na" and value not in ids[source_field]:
+                missing_values.add(value)
 
-        if missing_values:
-            issues.append(
-                Issue(
-                    field=dest_field,
-                    message=f"Foreign keys does not exist in original table {missing_values}",
-                    table_name=table_name,
-                    row=None,
-                )
+    if missing_values:
+        issues.append(
+            Issue(
+                field=dest_field,
+                message=f"Foreign keys does not exist in original table {missing_values}",
+                table_name=table_name,
+                row=None,
             )
+        )
@@ -0,0 +1,181 @@
+"""
+Validation of whole tables a column at a time. Most rules only depend on the
+value of a cell, e.g. `allowed`, `empty`, the coercions or the `is_int_or_na`,
+`is_gcp_path` and `must_start_with_*` checks. These are evaluated once for each
+distinct value of a column with the code generated for the field, and their
+outcome is mapped back to every row holding that value. Rules that read other
+columns of the row, e.g. `maternal_id_is_valid`, `conditional_required` or
+`dependencies`, are still evaluated row by row on the normalized row. The
+errors of each row are then ordered as cerberus orders them.
+"""
+
+from copy import copy
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from ..utils.columnar import MISSING, ColumnarTable
+from ..utils.types import Table
+from .compiled import CompiledError, CompiledValidator, format_errors, sort_errors
+from .sample import SampleValidator
+
+# check_with hooks that only read the value, the field and the batch number
+CONTEXT_FREE_CHECKS = {
+    "aligned_dna_short_read_id",
+    "analyte_id",
+    "experiment_nanopore_id_start",
+    "experiment_nanopore_id_end",
+    "experiment_sample_id",
+    "field_with_multi",
+    "is_float_or_na",
+    "is_gcp_path",
+    "is_int",
+    "is_int_or_na",
+    "is_na",
+    "must_start_with_bcm",
+    "must_start_with_bcm_fam",
+    "must_start_with_bcm_subject",
+    "must_start_with_bcm_subject_or_is_na",
+    "must_start_with_ontology",
+    "participant_id",
+}
+
+# Rules that only read the value
+CONTEXT_FREE_RULES = {
+    "allowed",
+    "check_with",
+    "coerce",
+    "empty",
+    "meta",
+    "nullable",
+    "required",
+    "type",
+}
+
+
+def is_context_free(rules: Optional[Mapping]) -> bool:
+    """Returns True if the rules of a field only read the value of the field"""
+    rules = rules or {}
+    checks = rules.get("check_with", [])
+    checks = [checks] if isinstance(checks, str) else checks
+    return set(rules) <= CONTEXT_FREE_RULES and all(
+        check in CONTEXT_FREE_CHECKS for check in checks
+    )
+
+
+class ErrorRecorder:
+    """Stands in for the validator in the generated code, keeping the errors
+    in the order they are added"""
+
+    __slots__ = ("batch_number", "document", "errors")
+
+    def __init__(self, batch_number: int) -> None:
+        self.batch_number = batch_number
+        self.document: dict = {}
+        self.errors: list[CompiledError] = []
+
+    def _add_error(self, field: str, rule: Optional[str], message: str) -> None:
+        self.errors.append(CompiledError(field, rule, message))
+
+    def _error(self, field: str, message: str) -> None:
+        self._add_error(field, None, message)
+
+
+class ColumnwiseValidator(CompiledValidator):
+    """A `CompiledValidator` that also validates whole tables, see
+    `validate_table`"""
+
+    def __init__(
+        self,
+        schema: Mapping,
+        batch_number: int,
+        validator_class: type = SampleValidator,
+    ) -> None:
+        super().__init__(schema, batch_number, validator_class)
+        self.context_free = {
+            field for field, rules in schema.items() if is_context_free(rules)
+        }
+
+    def validate_table(self, samples: Table) -> Iterator[tuple[dict, dict]]:
+        """Yields the normalized document and errors of every row, the same
+        as `validate` gives for the row"""
+        if not isinstance(samples, ColumnarTable):
+            samples = ColumnarTable.from_samples(samples)
+        columns = {
+            field: self.validate_column(field, samples.column(field))
+            for field in samples.header_index
+            if field in self.namespace["COERCERS"] or field in self.context_free
+        }
+        recorder = ErrorRecorder(self.batch_number)
+        for index, row in enumerate(samples):
+            yield self.validate_row(index, copy(row), columns, recorder)
+
+    def validate_row(
+        self, index: int, document: dict, columns: dict, recorder: ErrorRecorder
+    ) -> tuple[dict, dict]:
+        """Returns the normalized document and errors of a row, given the
+        outcome of `validate_column` for its columns"""
+        validators = self.namespace["VALIDATORS"]
+        coerce_errors, errors = [], []
+        for field, (values, field_coerce_errors, _) in columns.items():
+            if field in document:
+                document[field] = values[index]
+                coerce_errors += field_coerce_errors.get(index, ())
+        recorder.document, recorder.errors = document, errors
+        for field, value in document.items():
+            if field in self.context_free and field in columns:
+                errors += columns[field][2].get(index, ())
+            elif field in validators:
+                validators[field](value, document, recorder)
+        if not self.namespace["REQUIRED"].issubset(document):
+            for field in self.namespace["REQUIRED"] - set(document):
+                errors.append(CompiledError(field, "required", "required field"))
+        if not coerce_errors and not errors:
+            return document, {}
+        return document, format_errors(sort_errors(coerce_errors + errors))
+
+    def validate_column(
+        self, field: str, column: list
+    ) -> tuple[list, dict[int, tuple], dict[int, tuple]]:
+        """Returns the coerced values of a column, with the coercion errors and
+        the errors of the context free rules by row index. Each distinct value
+        is only coerced and validated once."""
+        coerce = self.namespace["COERCERS"].get(field)
+        validate = None
+        if field in self.context_free:
+            validate = self.namespace["VALIDATORS"][field]
+        recorder = ErrorRecorder(self.batch_number)
+        outcomes = {}
+        values, coerce_errors, errors = [], {}, {}
+        for index, value in enumerate(column):
+            if value is MISSING:
+                values.append(value)
+                continue
+            key = (type(value), value)
+            if (outcome := outcomes.get(key)) is None:
+                outcome = outcomes[key] = validate_value(
+                    field, value, (coerce, validate), recorder
+                )
+            values.append(outcome[0])
+            if outcome[1]:
+                coerce_errors[index] = outcome[1]
+            if outcome[2]:
+                errors[index] = outcome[2]
+        return values, coerce_errors, errors
+
+
+def validate_value(
+    field: str,
+    value: Any,
+    functions: tuple[Optional[Callable], Optional[Callable]],
+    recorder: ErrorRecorder,
+) -> tuple[Any, tuple, tuple]:
+    """Returns the coerced value with its coercion and validation errors, given
+    the generated coerce and validate functions of the field"""
+    coerce, validate = functions
+    recorder.document = document = {field: value}
+    recorder.errors = []
+    if coerce is not None:
+        coerce(document, recorder)
+    coerce_errors, recorder.errors = tuple(recorder.errors), []
+    if validate is not None:
+        validate(document[field], document, recorder)
+    return document[field], coerce_errors, tuple(recorder.errors)
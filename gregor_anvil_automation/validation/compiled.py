@@ -0,0 +1,383 @@
+"""
+Validators generated from the schemas. Cerberus resolves the rules of every
+field of every row, copies its errors into error trees and formats them on
+each access. A `CompiledValidator` instead runs Python code generated once
+per schema, with the rules of each field unrolled and `allowed` values held in
+frozensets, while the `check_with` and `coerce` hooks are the very methods of
+`SampleValidator`. It gives the same normalized documents and errors as a
+`SampleValidator` that allows unknown fields.
+"""
+
+from collections.abc import Iterable, Mapping, Sized
+from copy import copy
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from cerberus.utils import compare_paths_lt
+
+from .sample import SampleValidator
+
+# Rules cerberus no longer evaluates for a field that is None, or empty
+NULLABLE_DROPS = {"allowed", "empty", "type"}
+EMPTY_DROPS = {"allowed", "check_with"}
+
+# Rules that are not evaluated per field
+SKIPPED_RULES = {"coerce", "required", "meta"}
+
+VALIDATION_RULES = {
+    "nullable",
+    "type",
+    "empty",
+    "allowed",
+    "check_with",
+    "dependencies",
+}
+
+
+class CompiledError:
+    """An error ordered the way cerberus orders its `ValidationError`s"""
+
+    __slots__ = ("document_path", "schema_path", "message")
+
+    def __init__(self, field: str, rule: Optional[str], message: str) -> None:
+        self.document_path = (field,)
+        self.schema_path = (field, rule) if rule else ()
+        self.message = message
+
+    def __lt__(self, other: "CompiledError") -> bool:
+        if self.document_path != other.document_path:
+            return compare_paths_lt(self.document_path, other.document_path)
+        return compare_paths_lt(self.schema_path, other.schema_path)
+
+
+class CompiledValidator:
+    """Validates samples with the code generated for a schema. Like a
+    `SampleValidator`, the last validated document and its errors are kept in
+    `document` and `errors`."""
+
+    def __init__(
+        self,
+        schema: Mapping,
+        batch_number: int,
+        validator_class: type = SampleValidator,
+    ) -> None:
+        self.batch_number = batch_number
+        self.document: Optional[dict] = None
+        self._errors: list[CompiledError] = []
+        self.source, self.namespace = compile_schema(schema, validator_class)
+        self._validate = self.namespace["validate"]
+        self._normalize = self.namespace["normalize"]
+
+    def validate(self, document: Mapping) -> bool:
+        """Normalizes and validates a document, True if it has no errors"""
+        self._errors = []
+        self.document = copy(document)
+        self._validate(self.document, self)
+        return not self._errors
+
+    def normalized(
+        self, document: Mapping, always_return_document: bool = False
+    ) -> Optional[dict]:
+        """Returns the normalized document, None if it could not be normalized
+        unless `always_return_document`"""
+        self._errors = []
+        self.document = copy(document)
+        self._normalize(self.document, self)
+        if self._errors and not always_return_document:
+            return None
+        return self.document
+
+    @property
+    def errors(self) -> dict[str, list[str]]:
+        """The messages of the errors of the last document, by field"""
+        return format_errors(self._errors)
+
+    def _add_error(self, field: str, rule: Optional[str], message: str) -> None:
+        # Cerberus sorts its errors after each one it adds, which is not a
+        # total order for errors of the same rule, so neither is this
+        self._errors.append(CompiledError(field, rule, message))
+        self._errors.sort()
+
+    def _error(self, field: str, message: str) -> None:
+        """The custom errors of the `check_with` hooks"""
+        self._add_error(field, None, message)
+
+
+def compile_schema(
+    schema: Mapping, validator_class: type = SampleValidator
+) -> tuple[str, dict]:
+    """Returns the source generated for a schema and the namespace it was run
+    in, holding its `validate` and `normalize` functions"""
+    source, namespace = SchemaCompiler(validator_class).compile(schema)
+    namespace["copy"] = copy
+    code = compile(source, "<compiled schema>", "exec")
+    exec(code, namespace)  # pylint: disable=exec-used
+    return source, namespace
+
+
+def sort_errors(errors: Iterable[CompiledError]) -> list[CompiledError]:
+    """Returns errors in the order cerberus gives them when they are added one
+    after the other"""
+    ordered = []
+    for error in errors:
+        ordered.append(error)
+        ordered.sort()
+    return ordered
+
+
+def format_errors(errors: Iterable[CompiledError]) -> dict[str, list[str]]:
+    """Returns the messages of ordered errors by field, like cerberus"""
+    messages = {}
+    for error in errors:
+        messages.setdefault(error.document_path[0], []).append(error.message)
+    return messages
+
+
+class SchemaCompiler:
+    """Generates the `validate` and `normalize` functions of a schema. The rules
+    of each field are evaluated in the order of the rule queue of cerberus,
+    including the rules it drops on the way."""
+
+    def __init__(self, validator_class: type = SampleValidator) -> None:
+        self.validator_class = validator_class
+        self.namespace = {"Iterable": Iterable, "Sized": Sized}
+        self.index = 0
+        self.field = ""
+        self.rules = {}
+
+    def compile(self, schema: Mapping) -> tuple[str, dict]:
+        """Returns the source of the functions of the schema, along with the
+        constants and hooks they use"""
+        lines, coercers, validators = [], [], []
+        for self.index, (self.field, rules) in enumerate(schema.items()):
+            self.rules = rules or {}
+            for rule in self.rules:
+                if rule not in VALIDATION_RULES | SKIPPED_RULES:
+                    raise UnsupportedRule(self.field, rule)
+            if "coerce" in self.rules:
+                lines += self.generate_coerce()
+                coercers.append(f"{self.field!r}: coerce_{self.index}")
+            queue = ["nullable"] + [
+                rule for rule in ("type", "empty") if rule in self.rules
+            ]
+            queue += [
+                rule
+                for rule in self.rules
+                if rule not in queue and rule not in SKIPPED_RULES
+            ]
+            lines.append(
+                f"def validate_{self.index}(value, document, validator):  # {self.field}"
+            )
+            lines += self.block([], queue, "    ", known_str=False)
+            lines.append("")
+            validators.append(f"{self.field!r}: validate_{self.index}")
+        self.namespace["REQUIRED"] = set(
+            field
+            for field, rules in schema.items()
+            if (rules or {}).get("required") is True
+        )
+        lines += [
+            f"COERCERS = {{{', '.join(coercers)}}}",
+            f"VALIDATORS = {{{', '.join(validators)}}}",
+            "",
+            "def normalize(document, validator):",
+            "    for field in document:",
+            "        coercer = COERCERS.get(field)",
+            "        if coercer is not None:",
+            "            coercer(document, validator)",
+            "",
+            "def validate(document, validator):",
+            "    normalize(document, validator)",
+            "    for field in document:",
+            "        field_validator = VALIDATORS.get(field)",
+            "        if field_validator is not None:",
+            "            field_validator(document[field], document, validator)",
+            "    if not REQUIRED.issubset(document):",
+            "        for field in REQUIRED - set(document):",
+            "            validator._add_error(field, 'required', 'required field')",
+            "",
+        ]
+        return "\n".join(lines), self.namespace
+
+    def generate_coerce(self) -> list[str]:
+        """Returns the lines of the function coercing the field. A list of
+        coercers stops at the first one that fails."""
+        names = self.rules["coerce"]
+        names = [names] if isinstance(names, str) else names
+        field = self.field
+        lines = [f"def coerce_{self.index}(document, validator):  # {field}"]
+        for number, name in enumerate(names):
+            name = f"COERCE_{self.index}_{number}"
+            self.namespace[name] = self.get_hook("_normalize_coerce_", names[number])
+            lines += [
+                f"    value = document[{field!r}]",
+                "    try:",
+                f"        document[{field!r}] = {name}(validator, value)",
+                "    except Exception as error:",
+            ]
+            indent = "        "
+            if self.rules.get("nullable"):
+                # A nullable None that can not be coerced is not an error
+                lines.append(f"{indent}if value is not None:")
+                indent += "    "
+            message = f"f\"field '{field}' cannot be coerced: {{error}}\""
+            lines += [self.error(indent, "coerce", message), f"{indent}return"]
+        lines.append("")
+        return lines
+
+    def generate(self, queue: list[str], indent: str, known_str: bool) -> list[str]:
+        """Returns the lines evaluating a queue of rules. `known_str` is True
+        once the value is known to be a string."""
+        if not queue:
+            return []
+        rule, rest = queue[0], queue[1:]
+        return getattr(self, f"generate_{rule}")(rest, indent, known_str)
+
+    def block(
+        self, lines: list[str], queue: list[str], indent: str, known_str: bool
+    ) -> list[str]:
+        """Returns the body of a block, `lines` followed by the queue of rules"""
+        lines = lines + self.generate(queue, indent, known_str)
+        return lines or [f"{indent}pass"]
+
+    def error(self, indent: str, rule: Optional[str], message: str) -> str:
+        """Returns the line adding an error, `message` being an expression"""
+        return f"{indent}validator._add_error({self.field!r}, {rule!r}, {message})"
+
+    def get_hook(self, prefix: str, name: str) -> Any:
+        """Returns a hook method of the validator class, to be called with any
+        object that has its `document`, `batch_number` and `_error`"""
+        hook = getattr(self.validator_class, f"{prefix}{name}", None)
+        if hook is None:
+            raise UnsupportedRule(self.field, prefix.strip("_").split("_", 1)[-1])
+        return hook
+
+    def generate_nullable(self, rest, indent, known_str):
+        """None is an error unless the field is nullable"""
+        errors = []
+        if not self.rules.get("nullable", False):
+            message = "'null value not allowed'"
+            errors.append(self.error(indent + "    ", "nullable", message))
+        remaining = [rule for rule in rest if rule not in NULLABLE_DROPS]
+        return (
+            [f"{indent}if value is None:"]
+            + self.block(errors, remaining, indent + "    ", False)
+            + [f"{indent}else:"]
+            + self.block([], rest, indent + "    ", known_str)
+        )
+
+    def generate_type(self, rest, indent, known_str):
+        """A value of the wrong type stops the validation of the field"""
+        data_type = self.rules["type"]
+        if not data_type:
+            return self.generate(rest, indent, known_str)
+        types = (data_type,) if isinstance(data_type, str) else tuple(data_type)
+        checks = []
+        for number, type_name in enumerate(types):
+            definition = self.validator_class.types_mapping.get(type_name)
+            if definition is None:
+                raise UnsupportedRule(self.field, "type")
+            name = f"{self.index}_{number}"
+            self.namespace[f"TYPE_{name}"] = definition.included_types
+            check = f"isinstance(value, TYPE_{name})"
+            if definition.excluded_types:
+                self.namespace[f"NOT_TYPE_{name}"] = definition.excluded_types
+                check = f"({check} and not isinstance(value, NOT_TYPE_{name}))"
+            checks.append(check)
+        message = repr(f"must be of {data_type} type")
+        lines = [
+            f"{indent}if not {' or '.join(checks)}:",
+            self.error(indent + "    ", "type", message),
+        ]
+        if not rest:
+            return lines
+        lines.append(f"{indent}else:")
+        return lines + self.generate(rest, indent + "    ", types == ("string",))
+
+    def generate_empty(self, rest, indent, known_str):
+        """An empty value skips `allowed` and `check_with`"""
+        if known_str:
+            condition = "not value"
+        else:
+            condition = "isinstance(value, Sized) and len(value) == 0"
+        errors = []
+        if not self.rules["empty"]:
+            message = "'empty values not allowed'"
+            errors.append(self.error(indent + "    ", "empty", message))
+        remaining = [rule for rule in rest if rule not in EMPTY_DROPS]
+        lines = [f"{indent}if {condition}:"]
+        lines += self.block(errors, remaining, indent + "    ", known_str)
+        body = self.generate(rest, indent + "    ", known_str)
+        if body:
+            lines += [f"{indent}else:"] + body
+        return lines
+
+    def generate_allowed(self, rest, indent, known_str):
+        """Strings are looked up in a frozenset of the allowed values"""
+        name = f"ALLOWED_{self.index}"
+        allowed = self.rules["allowed"]
+        unallowed_value = 'f"unallowed value {value}"'
+        if known_str:
+            self.namespace[name] = frozenset(allowed)
+            lines = [
+                f"{indent}if value not in {name}:",
+                self.error(indent + "    ", "allowed", unallowed_value),
+            ]
+        else:
+            self.namespace[name] = allowed
+            lines = [
+                f"{indent}if isinstance(value, Iterable) and not isinstance(value, str):",
+                f"{indent}    unallowed = tuple(x for x in value if x not in {name})",
+                f"{indent}    if unallowed:",
+                self.error(
+                    indent + "        ", "allowed", 'f"unallowed values {unallowed}"'
+                ),
+                f"{indent}elif value not in {name}:",
+                self.error(indent + "    ", "allowed", unallowed_value),
+            ]
+        return lines + self.generate(rest, indent, known_str)
+
+    def generate_check_with(self, rest, indent, known_str):
+        """The hooks of the validator class, called with the validator as self"""
+        names = self.rules["check_with"]
+        names = [names] if isinstance(names, str) else names
+        lines = []
+        for number, check in enumerate(names):
+            if not isinstance(check, str):
+                raise UnsupportedRule(self.field, "check_with")
+            name = f"CHECK_{self.index}_{number}"
+            self.namespace[name] = self.get_hook("_check_with_", check)
+            lines.append(f"{indent}{name}(validator, {self.field!r}, value)")
+        return lines + self.generate(rest, indent, known_str)
+
+    def generate_dependencies(self, rest, indent, known_str):
+        """A missing dependency is an error. Cerberus means to stop validating
+        the field then, but looks the error up in its document error tree
+        instead of its schema error tree, so the other rules are evaluated."""
+        dependencies = self.rules["dependencies"]
+        if isinstance(dependencies, str):
+            dependencies = [dependencies]
+        if not isinstance(dependencies, list) or any(
+            not isinstance(name, str) or "." in name or name.startswith("^")
+            for name in dependencies
+        ):
+            raise UnsupportedRule(self.field, "dependencies")
+        lines = []
+        for name in dependencies:
+            message = repr(f"field '{name}' is required")
+            lines += [
+                f"{indent}if {name!r} not in document:",
+                self.error(indent + "    ", "dependencies", message),
+            ]
+        return lines + self.generate(rest, indent, known_str)
+
+
+#############
+# Exception #
+#############
+@dataclass
+class UnsupportedRule(Exception):
+    """Raised when the rule of a field can not be compiled"""
+
+    field: str
+    rule: str
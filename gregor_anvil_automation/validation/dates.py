@@ -0,0 +1,54 @@
+"""
+Normalization of dates to YYYY-MM-DD. The usual formats (M/D/YY, M-D-YYYY,
+YYYY/MM/DD...) are read with precompiled regexes and formatted directly, any
+other value is parsed by dateutil. Results are memoized per distinct value as
+the same few dates repeat throughout a column.
+"""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+from dateutil.parser import parse, parserinfo
+
+DATE_CACHE_SIZE = 2**12
+
+# Two digit years are read as dateutil reads them, i.e. within 50 years of now
+PARSER_INFO = parserinfo()
+
+MONTH_DAY_YEAR = re.compile(
+    r"(?P<month>[0-9]{1,2})(?P<sep>[/-])(?P<day>[0-9]{1,2})(?P=sep)"
+    r"(?P<year>[0-9]{2}|[1-9][0-9]{3})"
+)
+
+YEAR_MONTH_DAY = re.compile(
+    r"(?P<year>[1-9][0-9]{3})(?P<sep>[/-])(?P<month>[0-9]{1,2})(?P=sep)"
+    r"(?P<day>[0-9]{1,2})"
+)
+
+
+def format_date(match: re.Match) -> Optional[str]:
+    """Returns the matched date as YYYY-MM-DD, or None if it is not a valid
+    date"""
+    year, month, day = int(match["year"]), int(match["month"]), int(match["day"])
+    if len(match["year"]) == 2:
+        year = PARSER_INFO.convertyear(year)
+    try:
+        return date(year, month, day).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE, typed=True)
+def normalize_date(value: Any) -> Any:
+    """Returns the date as YYYY-MM-DD, or the value itself if it is not a
+    date. Raises what dateutil raises for values that are not strings."""
+    if isinstance(value, str):
+        match = MONTH_DAY_YEAR.fullmatch(value) or YEAR_MONTH_DAY.fullmatch(value)
+        if match and (formatted := format_date(match)):
+            return formatted
+    try:
+        return datetime.strftime(parse(value), "%Y-%m-%d")
+    except ValueError:
+        return value
@@ -0,0 +1,58 @@
+"""
+The engines validating the rows of a table:
+
+- `cerberus`: a `SampleValidator`
+- `compiled`: a `CompiledValidator`, running code generated from the schema
+- `columnwise`: a `ColumnwiseValidator`, validating a column at a time
+
+All of them give the same normalized rows and errors. `columnwise` is the
+default as its work grows with the distinct values of the columns rather than
+the number of rows.
+"""
+
+from logging import getLogger
+from typing import Any, Iterator, Mapping
+
+from ..utils.types import Table
+from .columnwise import ColumnwiseValidator
+from .compiled import CompiledValidator, UnsupportedRule
+from .sample import SampleValidator
+
+logger = getLogger(__name__)
+
+ENGINES = ["cerberus", "compiled", "columnwise"]
+
+DEFAULT_ENGINE = "columnwise"
+
+COMPILED_ENGINES = {"compiled": CompiledValidator, "columnwise": ColumnwiseValidator}
+
+
+def get_sample_validator(
+    schema: Mapping, batch_number: int, engine: str = "cerberus"
+) -> Any:
+    """Returns the validator of the engine, which allows unknown fields. A
+    schema the compiler does not support is validated by cerberus."""
+    if engine in COMPILED_ENGINES:
+        try:
+            return COMPILED_ENGINES[engine](schema, batch_number)
+        except UnsupportedRule as error:
+            logger.warning(
+                "Validating With Cerberus, Rule %s of %s Is Not Compiled",
+                error.rule,
+                error.field,
+            )
+    sample_validator = SampleValidator(schema=schema, batch_number=batch_number)
+    sample_validator.allow_unknown = True
+    return sample_validator
+
+
+def validate_rows(sample_validator: Any, samples: Table) -> Iterator[tuple[dict, dict]]:
+    """Yields the normalized document and errors of every row. A validator
+    with a `validate_table`, e.g. a `ColumnwiseValidator`, validates the whole
+    table at once."""
+    if hasattr(sample_validator, "validate_table"):
+        yield from sample_validator.validate_table(samples)
+        return
+    for sample in samples:
+        sample_validator.validate(sample)
+        yield sample_validator.document, sample_validator.errors
@@ -0,0 +1,141 @@
+"""
+The grammar of the IDs of a submission:
+
+- participant: `<center>_Subject_<subject>_<member>`, e.g. BCM_Subject_1_1
+- analyte: `<participant>_<type letter><batch>`, e.g. BCM_Subject_1_1_A1
+- aligned reads: `<experiment>_A<batch>`, e.g. BCM_Subject_1_1_A1_A1
+
+Each ID is parsed once into a `ParsedID`, memoized across all rows and tables,
+and the checks of `SampleValidator` work from the parsed ID. Numbers are read
+with `int` and `str.isnumeric` as the checks always did, so the very same IDs
+are accepted.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+ID_CACHE_SIZE = 2**16
+
+PARTICIPANT_PREFIX = "BCM_Subject_"
+
+PARTICIPANT_ID = re.compile(
+    r"(?P<center>[^_]*)_Subject_(?P<subject>[^_]*)_(?P<member>[^_]*)\Z", re.DOTALL
+)
+
+ANALYTE_ID = re.compile(
+    r"(?P<center>[^_]*)_Subject_(?P<subject>[^_]*)_(?P<member>[^_]*)"
+    r"_(?P<type_letter>[^_]?)(?P<batch>[^_]*)\Z",
+    re.DOTALL,
+)
+
+# The experiment ends at the first _A, the batch follows the last one
+ALIGNED_ID = re.compile(r"(?P<experiment>.*?)_A(?:.*_A)?(?P<batch>.*)\Z", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class ParsedID:
+    """An ID taken apart by the grammar. The subject and member are set for
+    participant and analyte IDs, the type letter and batch for analyte IDs. The
+    family is the ID without its last part, e.g. BCM_Subject_1 for
+    BCM_Subject_1_1."""
+
+    center: str
+    family: str
+    last: str
+    subject: Optional[str] = None
+    member: Optional[str] = None
+    type_letter: Optional[str] = None
+    batch: Optional[int] = None
+
+    @property
+    def member_number(self) -> Optional[int]:
+        """The member as a number, if it is one"""
+        if self.member is None or not self.member.isnumeric():
+            return None
+        return to_int(self.member)
+
+
+def to_int(text: str) -> Optional[int]:
+    """Returns the text as an int, or None if it is not one"""
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def parse_id(value: str) -> ParsedID:
+    """Returns the parsed ID"""
+    family, _, last = value.rpartition("_")
+    fields = {"center": value.partition("_")[0], "family": family, "last": last}
+    if match := ANALYTE_ID.match(value):
+        fields |= match.groupdict()
+        fields["batch"] = to_int(match["batch"])
+    elif match := PARTICIPANT_ID.match(value):
+        fields |= match.groupdict()
+    return ParsedID(**fields)
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def parse_aligned_id(value: str) -> tuple[str, Optional[int]]:
+    """Returns the experiment and batch of an aligned reads ID. Without an _A
+    the experiment is the whole ID."""
+    if match := ALIGNED_ID.match(value):
+        return match["experiment"], to_int(match["batch"])
+    return value, to_int(value)
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def parse_batch_suffix(value: str, participant_id: str) -> tuple[str, int]:
+    """Returns the type letter and batch following `<participant_id>_` in an
+    analyte ID. Raises `IndexError` or `ValueError` if there are none."""
+    batch_id = value.split(f"{participant_id}_")[-1]
+    return batch_id[0], int(batch_id[1:])
+
+
+@lru_cache(maxsize=ID_CACHE_SIZE)
+def parse_prefixed_batch(value: str, prefix: str) -> Optional[int]:
+    """Returns the batch following the prefix of an ID, or None"""
+    if not value.startswith(prefix):
+        return None
+    return to_int(value.split(prefix)[-1])
+
+
+class IDGrammar:
+    """The ID grammar of a batch, accepting batches 1 to `batch_number`"""
+
+    def __init__(self, batch_number: int) -> None:
+        self.batch_number = batch_number
+
+    def in_batch(self, batch: Optional[int]) -> bool:
+        """Returns True if the batch is between 1 and the batch number"""
+        return batch is not None and 1 <= batch <= self.batch_number
+
+    def is_participant_id(self, value: str) -> bool:
+        """BCM_Subject_ followed by anything ending with _{a number}"""
+        return value.startswith(PARTICIPANT_PREFIX) and parse_id(value).last.isnumeric()
+
+    def is_analyte_id(self, value: str) -> bool:
+        """BCM_Subject_{subject}_{a number}_{a type letter}{a batch}"""
+        parsed = parse_id(value)
+        return (
+            parsed.center == "BCM"
+            and parsed.member_number is not None
+            and self.in_batch(parsed.batch)
+        )
+
+    def is_aligned_id(self, value: str) -> bool:
+        """BCM_ followed by anything ending with _A{a batch}"""
+        return value.startswith("BCM_") and self.in_batch(parse_aligned_id(value)[1])
+
+    def is_prefixed_id(self, value: str, prefix: str) -> bool:
+        """The prefix followed by a batch"""
+        return self.in_batch(parse_prefixed_batch(value, prefix))
+
+
+@lru_cache(maxsize=None)
+def get_id_grammar(batch_number: int) -> IDGrammar:
+    """Returns the ID grammar of the batch number"""
+    return IDGrammar(batch_number)
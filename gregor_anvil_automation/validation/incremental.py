@@ -0,0 +1,67 @@
+"""
+Per row validation results kept between runs of the same batch. A row is only
+validated again when its content, the schema of its table or this package
+changed since the last run.
+"""
+
+import hashlib
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from ..__version__ import __version__
+from ..utils.cache import DiskCache
+
+logger = getLogger(__name__)
+
+
+def hash_row(sample: Mapping) -> bytes:
+    """Returns a digest of the content of a row, ignoring where it is"""
+    content = repr([item for item in sample.items() if item[0] != "row_number"])
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+class ValidationResults:
+    """The normalized documents and errors of the rows of a table, keyed by the
+    hash of the row. Results of the last run are loaded from the state
+    directory and the results of this run replace them when saved."""
+
+    def __init__(
+        self, state_dir: Path, batch_number: int, table_name: str, schema_hash: str
+    ) -> None:
+        self.cache = DiskCache(state_dir / f"batch_{batch_number}")
+        self.table_name = table_name
+        self.stamp = (schema_hash, __version__)
+        self.previous: dict[bytes, tuple[dict, dict]] = {}
+        self.current: dict[bytes, tuple[dict, dict]] = {}
+        self.reused = 0
+
+    def load(self) -> None:
+        """Loads the results of the last run if they are still valid"""
+        state = self.cache.load(self.table_name)
+        if state is None:
+            return
+        if state["stamp"] != self.stamp:
+            logger.info("Schema of Table %s Changed Since Last Run", self.table_name)
+            return
+        self.previous = state["rows"]
+
+    def get(self, row_hash: bytes) -> Optional[tuple[dict, dict]]:
+        """Returns the document and errors of an unchanged row and keeps them
+        for the next run"""
+        result = self.previous.get(row_hash)
+        if result is not None:
+            self.current[row_hash] = result
+            self.reused += 1
+        return result
+
+    def add(self, row_hash: bytes, document: Mapping, errors: dict[str, Any]) -> None:
+        """Records the result of a validated row"""
+        document = {
+            field: value for field, value in document.items() if field != "row_number"
+        }
+        self.current[row_hash] = (document, errors)
+
+    def save(self) -> None:
+        """Saves the results of this run"""
+        self.cache.store(self.table_name, {"stamp": self.stamp, "rows": self.current})
@@ -0,0 +1,76 @@
+"""Interning of the values of columns with a fixed vocabulary"""
+
+import sys
+from functools import lru_cache
+from logging import getLogger
+from typing import Mapping, Optional
+
+from ..utils.mappings import MULTI_FIELD_MAP
+from ..utils.types import Table
+from .schema import SchemaDoesNotExist, get_schema
+from .typed import get_checks
+
+logger = getLogger(__name__)
+
+
+def get_intern_tables(schema: Mapping) -> dict[str, dict[str, str]]:
+    """Returns an intern table for every column of the schema with a fixed
+    vocabulary, i.e. columns with `allowed` values or a `MULTI_FIELD_MAP`
+    vocabulary. Each intern table is seeded with the vocabulary so normalized
+    values end up being the very objects the checks compare against."""
+    intern_tables = {}
+    for field, rules in schema.items():
+        if not rules:
+            continue
+        if "allowed" in rules:
+            vocabulary = rules["allowed"]
+        elif "field_with_multi" in get_checks(rules):
+            vocabulary = MULTI_FIELD_MAP[field]
+        else:
+            continue
+        intern_tables[field] = {value: value for value in vocabulary}
+    return intern_tables
+
+
+@lru_cache(maxsize=None)
+def get_table_intern_tables(table_name: str) -> dict[str, dict[str, str]]:
+    """Returns the intern tables of a table, built from its schema only once.
+    Interning adds to them, so they must be copied before use."""
+    return get_intern_tables(get_schema(table_name))
+
+
+def intern_table(table: Table, intern_tables: dict[str, dict[str, str]]) -> int:
+    """Replaces every string of the interned columns with its canonical
+    instance. Returns the number of bytes that are no longer referenced."""
+    saved = 0
+    for field, interned in intern_tables.items():
+        if field not in table.header_index:
+            continue
+        column = table.column(field)
+        for idx, value in enumerate(column):
+            if not isinstance(value, str):
+                continue
+            canonical = interned.setdefault(value, value)
+            if canonical is not value:
+                column[idx] = canonical
+                saved += sys.getsizeof(value)
+    return saved
+
+
+def intern_table_values(
+    table_name: str, table: Table, schema: Optional[Mapping] = None
+) -> None:
+    """Interns the fixed vocabulary columns of a table and logs the memory
+    saved. Without a `schema`, the schema of the table is only read once."""
+    if schema is None:
+        try:
+            intern_tables = {
+                field: dict(interned)
+                for field, interned in get_table_intern_tables(table_name).items()
+            }
+        except SchemaDoesNotExist:
+            return
+    else:
+        intern_tables = get_intern_tables(schema)
+    saved = intern_table(table, intern_tables)
+    logger.info("Interning Saved %s Bytes in Table %s", saved, table_name)
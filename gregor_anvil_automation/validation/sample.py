@@ -1,16 +1,22 @@
 """Custom cerberus validator for GREGoR project"""
 
-from datetime import datetime
+from datetime import date
 from string import capwords
 
 from cerberus import Validator
-from dateutil.parser import parse
 
 from gregor_anvil_automation.utils.mappings import (
     MULTI_FIELD_MAP,
     CAN_NOT_BE_NA,
     CONDITIONALLY_REQ_MAPPING,
 )
+from gregor_anvil_automation.validation.dates import normalize_date
+from gregor_anvil_automation.validation.ids import (
+    get_id_grammar,
+    parse_aligned_id,
+    parse_batch_suffix,
+    parse_id,
+)
 
 
 class SampleValidator(Validator):
@@ -51,13 +57,8 @@ class SampleValidator(Validator):
         experiment_nanopore_id = self.document.get("experiment_nanopore_id")
         if not experiment_nanopore_id:
             return
-        try:
-            value_number = int(value.split(f"{experiment_nanopore_id}_A")[-1])
-            if not value.startswith(f"{experiment_nanopore_id}_A") or not (
-                1 <= value_number <= self.batch_number
-            ):
-                raise ValueError
-        except ValueError:
+        ids = get_id_grammar(self.batch_number)
+        if not ids.is_prefixed_id(value, f"{experiment_nanopore_id}_A"):
             self._error(
                 field,
                 f"Value must start with {experiment_nanopore_id}_A and end with a number between 1 and {self.batch_number}, inclusively",
@@ -69,13 +70,7 @@ class SampleValidator(Validator):
             - Starts with BCM_
             - Ends with a number between 1 and {batch_number}, inclusively
         """
-        try:
-            value_number = int(value.split("_A")[-1])
-            if not value.startswith("BCM_") or not (
-                1 <= value_number <= self.batch_number
-            ):
-                raise ValueError
-        except ValueError:
+        if not get_id_grammar(self.batch_number).is_aligned_id(value):
             self._error(
                 field,
                 f"Value must start with BCM_ and end with _A{self.batch_number}, inclusively",
@@ -97,10 +92,7 @@ class SampleValidator(Validator):
         Valid if:
             - Ends with _{some_number}
         """
-        end_string = ""
-        if value.split("_")[-1]:
-            end_string = value.split("_")[-1]
-        if not end_string.isnumeric():
+        if not parse_id(value).last.isnumeric():
             self._error(
                 field,
                 "Value must end with _{some_number}",
@@ -115,41 +107,11 @@ class SampleValidator(Validator):
         This should be used whenever `analyte_id` is not povided along with the `participant_id`.
         """
         error_message = f"Value must start with BCM_Subject_ and ends with _`a number`_A and then a number between 1 and {self.batch_number}, inclusively"
-        if not value.startswith("BCM_Subject_"):
+        if not get_id_grammar(self.batch_number).is_analyte_id(value):
             self._error(
                 field,
                 error_message,
             )
-            return
-
-        parts = value.split("_")
-        if len(parts) != 5:
-            self._error(
-                field,
-                error_message,
-            )
-            return
-        if not parts[3].isnumeric():
-            self._error(
-                field,
-                error_message,
-            )
-            return
-        try:
-            given_batch_number = int(parts[-1][1:])
-            int(parts[-2])
-        except ValueError:
-            self._error(
-                field,
-                error_message,
-            )
-            return
-        if not 1 <= given_batch_number <= self.batch_number:
-            self._error(
-                field,
-                error_message,
-            )
-            return
 
     def _check_with_analyte_id_matches_participant_id(self, field: str, value: str):
         """Checks that the analyte_id is valid:
@@ -163,8 +125,7 @@ class SampleValidator(Validator):
             return
         if participant_id not in value:
             self._error(field, "Value must contain the participant_id.")
-        batch_id = value.split(f"{participant_id}_")[-1]
-        batch_type, batch_number = batch_id[0], int(batch_id[1:])
+        batch_type, batch_number = parse_batch_suffix(value, participant_id)
         if (analyte_type == "RNA" and batch_type != "R") or (
             analyte_type == "DNA" and batch_type != "A"
         ):
@@ -172,7 +133,7 @@ class SampleValidator(Validator):
                 field,
                 "Value is using incorrect batch type identifier. Ex: Using `R` for DNA",
             )
-        if not 1 <= batch_number <= self.batch_number:
+        if not get_id_grammar(self.batch_number).in_batch(batch_number):
             self._error(field, "Batch number should be >=1 and <= {self.batch_number}")
 
     def _check_with_experiment_dna_short_read_id(self, field: str, value: str):
@@ -184,7 +145,7 @@ class SampleValidator(Validator):
         aligned_dna_short_read_id = self.document.get("aligned_dna_short_read_id")
         if not aligned_dna_short_read_id:
             return
-        experiment_dna_short_read_id = aligned_dna_short_read_id.split("_A")[0]
+        experiment_dna_short_read_id = parse_aligned_id(aligned_dna_short_read_id)[0]
         if value != experiment_dna_short_read_id:
             self._error(
                 field,
@@ -231,12 +192,7 @@ class SampleValidator(Validator):
             - starts with BCM_Subject_
             - ends with _{a number}
         """
-        end_string = value.split("_")[-1]
-        if (
-            not value.startswith("BCM_Subject_")
-            or not end_string.isnumeric()
-            or not value.endswith((f"_{end_string}"))
-        ):
+        if not get_id_grammar(self.batch_number).is_participant_id(value):
             self._error(
                 field,
                 "Value must start with BCM_Subject and end with _{a number}",
@@ -254,7 +210,7 @@ class SampleValidator(Validator):
         participant_id = self.document.get("participant_id")
         if not participant_id or value == "0":
             return
-        participant_substring = "_".join(participant_id.split("_")[:-1])
+        participant_substring = parse_id(participant_id).family
         if not value.endswith("_2"):
             self._error(
                 field,
@@ -291,7 +247,7 @@ class SampleValidator(Validator):
         participant_id = self.document.get("participant_id")
         if not participant_id or value == "0":
             return
-        participant_substring = "_".join(participant_id.split("_")[:-1])
+        participant_substring = parse_id(participant_id).family
         if not value.endswith("_3"):
             self._error(field, "Value does not end with _3")
         if participant_substring not in value:
@@ -394,12 +350,11 @@ class SampleValidator(Validator):
         - MM/DD/YYYY
         - MM-DD-YYYY
         - YYYY/MM/DD
-        to the format of YYYY-MM-DD
+        to the format of YYYY-MM-DD. Dates read from typed excel cells are
+        formatted directly, see `normalize_date` for the others.
         """
+        if isinstance(value, date):
+            return value.strftime("%Y-%m-%d")
         if value == "NA":
             return value
-        try:
-            value = datetime.strftime(parse(value), "%Y-%m-%d")
-        except ValueError:
-            pass
-        return value
+        return normalize_date(value)
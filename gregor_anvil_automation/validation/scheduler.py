@@ -0,0 +1,78 @@
+"""
+Scheduling of the validation of the tables of a submission. The tables are
+validated concurrently and each cross reference check of `CROSS_REF_CHECK` runs
+as soon as the tables it depends on are validated: the table holding the
+foreign keys and the `REFERENCE_SOURCE` table of the primary key, if it was
+submitted. The issues come out in the order of validating the tables one after
+another and then running every cross reference check.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging import getLogger
+from typing import Callable, Iterable
+
+from ..utils.issue import Issue
+from ..utils.mappings import CROSS_REF_CHECK, REFERENCE_SOURCE
+
+logger = getLogger(__name__)
+
+Reference = tuple[str, str, str]
+
+
+def get_reference_dependencies(
+    table_names: Iterable[str],
+) -> list[tuple[Reference, set[str]]]:
+    """Returns the cross reference checks of the tables, in the order of
+    `CROSS_REF_CHECK`, with the tables each one depends on"""
+    table_names = set(table_names)
+    source_tables = {
+        primary_key: table_name
+        for table_name, primary_key in REFERENCE_SOURCE.items()
+        if table_name in table_names
+    }
+    dependencies = []
+    for reference in CROSS_REF_CHECK:
+        table_name, source_field, _ = reference
+        if table_name not in table_names:
+            continue
+        depends_on = {table_name}
+        if source_field in source_tables:
+            depends_on.add(source_tables[source_field])
+        dependencies.append((reference, depends_on))
+    return dependencies
+
+
+def schedule_tables(
+    table_names: list[str],
+    validate_table: Callable[[str], list[Issue]],
+    check_reference: Callable[[Reference], list[Issue]],
+    workers: int = 1,
+) -> list[Issue]:
+    """Runs `validate_table` for every table in `workers` threads and
+    `check_reference` for each cross reference check once its tables are
+    validated. Returns the issues of the tables in the order of `table_names`
+    followed by those of the checks in the order of `CROSS_REF_CHECK`."""
+    dependencies = get_reference_dependencies(table_names)
+    waiting = {
+        index: set(depends_on) for index, (_, depends_on) in enumerate(dependencies)
+    }
+    table_issues, reference_issues = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(validate_table, table_name): table_name
+            for table_name in table_names
+        }
+        for future in as_completed(futures):
+            table_name = futures[future]
+            table_issues[table_name] = future.result()
+            for index, depends_on in list(waiting.items()):
+                depends_on.discard(table_name)
+                if not depends_on:
+                    del waiting[index]
+                    reference_issues[index] = check_reference(dependencies[index][0])
+    issues = []
+    for table_name in table_names:
+        issues.extend(table_issues[table_name])
+    for index in range(len(dependencies)):
+        issues.extend(reference_issues[index])
+    return issues
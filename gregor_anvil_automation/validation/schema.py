@@ -1,28 +1,94 @@
-"""Utility functions in regards to schema"""
+"""
+Utility functions in regards to schema. The schema files are compiled into a
+bundle of plain dicts, stamped with the hash of every file, that is stored in
+the cache dir and loaded once per process. The bundle is compiled again as soon
+as a schema file no longer matches its stamp.
+"""
 
+import copy
+import hashlib
+from functools import lru_cache
+from logging import getLogger
 from pathlib import Path
+from typing import Optional
 
-import addict
+import yaml
 
-from ..utils.utils import parse_yaml
+from ..utils.cache import DiskCache, get_cache_dir
 
+logger = getLogger(__name__)
 
-def get_schema(table_name: str) -> addict.Dict:
-    """Returns the schema"""
-    schema = get_schema_path(table_name)
-    return parse_yaml(schema)
+SCHEMAS_DIR = Path(__file__).resolve().parent / "schemas"
+
+# Bump whenever the layout of the bundle changes
+BUNDLE_VERSION = 1
+
+BUNDLE_KEY = "schemas"
+
+
+def get_schema(table_name: str) -> dict:
+    """Returns the schema. Every call gets its own copy of the compiled schema,
+    so it can be changed by the caller."""
+    schemas = load_schema_bundle()["schemas"]
+    if table_name not in schemas:
+        raise SchemaDoesNotExist(table_name)
+    return copy.deepcopy(schemas[table_name])
+
+
+def get_schema_hash(table_name: str) -> str:
+    """Returns the sha256 digest of the schema file of the given table"""
+    hashes = load_schema_bundle()["hashes"]
+    if table_name not in hashes:
+        raise SchemaDoesNotExist(table_name)
+    return hashes[table_name]
 
 
 def get_schema_path(table_name: str) -> Path:
     """Returns the path of the schema associated with the given table name. If
     it does not exist, it will return a SchemaDoesNotExist error."""
-    parent_dir = Path(__file__).resolve().parent
-    schema_path = parent_dir / "schemas" / f"{table_name}.yaml"
+    schema_path = SCHEMAS_DIR / f"{table_name}.yaml"
     schema_path = schema_path.resolve()
     if not schema_path.exists():
         raise SchemaDoesNotExist(table_name)
     return schema_path
 
 
+def get_schema_hashes() -> dict[str, str]:
+    """Returns the sha256 digest of every schema file, by table name"""
+    return {
+        schema_path.stem: hashlib.sha256(schema_path.read_bytes()).hexdigest()
+        for schema_path in sorted(SCHEMAS_DIR.glob("*.yaml"))
+    }
+
+
+@lru_cache(maxsize=None)
+def load_schema_bundle() -> dict:
+    """Returns the compiled schemas, loaded once per process. A bundle that is
+    missing or stale is compiled again."""
+    hashes = get_schema_hashes()
+    bundle = DiskCache(get_cache_dir(name="schemas")).load(BUNDLE_KEY)
+    if (
+        bundle is None
+        or bundle.get("version") != BUNDLE_VERSION
+        or bundle.get("hashes") != hashes
+    ):
+        logger.info("Compiling Schemas")
+        bundle = compile_schemas()
+    return bundle
+
+
+def compile_schemas(cache_dir: Optional[Path] = None) -> dict:
+    """Parses every schema file into a bundle of plain dicts, stamped with the
+    hash of each file, and stores it in the cache dir"""
+    schemas, hashes = {}, {}
+    for schema_path in sorted(SCHEMAS_DIR.glob("*.yaml")):
+        text = schema_path.read_bytes()
+        schemas[schema_path.stem] = yaml.safe_load(text) or {}
+        hashes[schema_path.stem] = hashlib.sha256(text).hexdigest()
+    bundle = {"version": BUNDLE_VERSION, "hashes": hashes, "schemas": schemas}
+    DiskCache(get_cache_dir(cache_dir, "schemas")).store(BUNDLE_KEY, bundle)
+    return bundle
+
+
 class SchemaDoesNotExist(Exception):
     """Raised if a schema that was called does not exists."""
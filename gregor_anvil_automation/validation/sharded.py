@@ -0,0 +1,103 @@
+"""
+Validation of large tables in a pool of worker processes. A table is split into
+chunks of consecutive rows, each validated by a worker with the validator of the
+engine, and the normalized documents and errors are yielded back in the order
+of the rows, the very same as validating the table in this process.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+from ..utils.columnar import ColumnarTable
+from ..utils.types import Table
+from .engines import get_sample_validator, validate_rows
+from .schema import get_schema, load_schema_bundle
+
+logger = getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# The batch number and engine of a worker process, see `init_worker`
+WORKER_OPTIONS: dict[str, Any] = {}
+
+
+@contextmanager
+def get_validation_pool(
+    batch_number: int, engine: str, workers: int
+) -> Iterator[Optional[Executor]]:
+    """Yields a pool of `workers` processes validating the rows of a batch, or
+    None when validating in this process"""
+    if workers <= 1:
+        yield None
+        return
+    logger.info("Starting %s Validation Workers", workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(batch_number, engine),
+    ) as pool:
+        yield pool
+
+
+def init_worker(batch_number: int, engine: str) -> None:
+    """Warms a worker process with the compiled schemas"""
+    WORKER_OPTIONS.update(batch_number=batch_number, engine=engine)
+    load_schema_bundle()
+
+
+@lru_cache(maxsize=None)
+def get_worker_validator(table_name: str) -> Any:
+    """Returns the validator of a table in a worker process, built once"""
+    return get_sample_validator(
+        get_schema(table_name),
+        WORKER_OPTIONS["batch_number"],
+        WORKER_OPTIONS["engine"],
+    )
+
+
+def validate_chunk(table_name: str, chunk: Table) -> tuple[list, float]:
+    """Returns the normalized documents and errors of the rows of a chunk, and
+    the seconds it took to validate them"""
+    start = perf_counter()
+    validated = list(validate_rows(get_worker_validator(table_name), chunk))
+    return validated, perf_counter() - start
+
+
+class ShardedValidator:
+    """Validates the rows of a table in chunks of `chunk_size` rows, spread
+    over the processes of the pool"""
+
+    def __init__(self, pool: Executor, table_name: str, chunk_size: int) -> None:
+        self.pool = pool
+        self.table_name = table_name
+        self.chunk_size = chunk_size
+
+    def validate_table(self, samples: Table) -> Iterator[tuple[dict, dict]]:
+        """Yields the normalized document and errors of every row, in the
+        order of the rows"""
+        chunks = [
+            get_chunk(samples, start, start + self.chunk_size)
+            for start in range(0, len(samples), self.chunk_size)
+        ]
+        results = self.pool.map(validate_chunk, [self.table_name] * len(chunks), chunks)
+        for chunk, (validated, seconds) in zip(chunks, results):
+            logger.info(
+                "Validated Rows %s to %s of Table %s in %.2fs",
+                chunk[0]["row_number"],
+                chunk[-1]["row_number"],
+                self.table_name,
+                seconds,
+            )
+            yield from validated
+
+
+def get_chunk(samples: Table, start: int, stop: int) -> Table:
+    """Returns the rows of a table from `start` to `stop`, that can be sent to
+    a worker process"""
+    if isinstance(samples, ColumnarTable):
+        return samples.take(range(start, min(stop, len(samples))))
+    return list(samples[start:stop])
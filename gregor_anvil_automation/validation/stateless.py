@@ -0,0 +1,59 @@
+"""
+A validator that keeps no state between calls. A `SampleValidator` keeps the
+document and errors of the last call on itself, and its hooks read them back
+from `self`, so an instance can only validate one row at a time. A
+`RowValidator` runs the code generated for a schema with the state of each call
+held by a recorder of its own, so one instance per table can be shared by any
+number of threads without locking, for any batch.
+"""
+
+from copy import copy
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Mapping
+
+from ..utils.issue import Issue
+from .columnwise import ErrorRecorder
+from .compiled import compile_schema, format_errors, sort_errors
+from .sample import SampleValidator
+from .schema import get_schema
+
+
+@dataclass(frozen=True)
+class ValidationContext:
+    """What a row is validated for"""
+
+    batch_number: int
+    table_name: str
+
+
+class RowValidator:
+    """Validates rows with the code generated for a schema, giving the same
+    normalized rows and errors as a `SampleValidator` that allows unknown
+    fields"""
+
+    def __init__(
+        self, schema: Mapping, validator_class: type = SampleValidator
+    ) -> None:
+        _, namespace = compile_schema(schema, validator_class)
+        self._validate = namespace["validate"]
+
+    def validate(
+        self, row: Mapping, context: ValidationContext
+    ) -> tuple[dict, list[Issue]]:
+        """Returns the normalized row and its issues"""
+        recorder = ErrorRecorder(context.batch_number)
+        recorder.document = document = copy(row)
+        self._validate(document, recorder)
+        issues = [
+            Issue(field, message, context.table_name, row.get("row_number"))
+            for field, messages in format_errors(sort_errors(recorder.errors)).items()
+            for message in messages
+        ]
+        return document, issues
+
+
+@lru_cache(maxsize=None)
+def get_row_validator(table_name: str) -> RowValidator:
+    """Returns the validator shared by every row of a table"""
+    return RowValidator(get_schema(table_name))
@@ -0,0 +1,83 @@
+"""
+Formatting of the native cell values kept when excel files are read in typed
+mode. Each column is formatted as its schema declares: integer columns from
+the number itself, so 12.0 is "12" rather than "12.0", and date columns are
+left as dates for `SampleValidator` to format without parsing a string.
+"""
+
+from datetime import date
+from logging import getLogger
+from typing import Any, Callable, Mapping, Optional
+
+from ..utils.columnar import MISSING
+from ..utils.types import Table
+from .schema import SchemaDoesNotExist, get_schema
+
+logger = getLogger(__name__)
+
+INT_CHECKS = {"is_int", "is_int_or_na"}
+
+
+def format_int(value: Any) -> Any:
+    """Formats an integral number without a decimal part"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return format_value(value)
+
+
+def format_date(value: Any) -> Any:
+    """Keeps dates for the `year_month_date` coercion"""
+    return value if isinstance(value, date) else format_value(value)
+
+
+def format_value(value: Any) -> Any:
+    """Formats a value the way it is formatted when not read in typed mode"""
+    return value if isinstance(value, str) else str(value).strip()
+
+
+def get_value_formatters(schema: Mapping) -> dict[str, Callable[[Any], Any]]:
+    """Returns the formatter of every column that is not a plain string"""
+    formatters = {}
+    for field, rules in schema.items():
+        if not rules:
+            continue
+        if rules.get("coerce") == "year_month_date":
+            formatters[field] = format_date
+        elif INT_CHECKS.intersection(get_checks(rules)):
+            formatters[field] = format_int
+    return formatters
+
+
+def get_checks(rules: Mapping) -> list[str]:
+    """Returns the `check_with` rules of a field, which may be a single one"""
+    checks = rules.get("check_with") or []
+    return [checks] if isinstance(checks, str) else list(checks)
+
+
+def format_table_values(table: Table, schema: Mapping) -> int:
+    """Formats the non string values of a table in place. Returns the number of
+    formatted values."""
+    formatters = get_value_formatters(schema)
+    formatted = 0
+    for header, column in zip(table.header_index, table.columns):
+        formatter = formatters.get(header, format_value)
+        for idx, value in enumerate(column):
+            if isinstance(value, str) or value is None or value is MISSING:
+                continue
+            column[idx] = formatter(value)
+            formatted += 1
+    return formatted
+
+
+def format_typed_values(
+    table_name: str, table: Table, schema: Optional[Mapping] = None
+) -> None:
+    """Formats the native values of a table read in typed mode. Tables without
+    a schema get every value formatted as a string."""
+    if schema is None:
+        try:
+            schema = get_schema(table_name)
+        except SchemaDoesNotExist:
+            schema = {}
+    formatted = format_table_values(table, schema)
+    logger.info("Formatted %s Typed Values in Table %s", formatted, table_name)
@@ -4,6 +4,8 @@ import addict
 import pytest
 import yaml
 
+from gregor_anvil_automation.validation.schema import load_schema_bundle
+
 
 def pytest_addoption(parser):
     parser.addoption(
@@ -32,6 +34,18 @@ def pytest_collection_modifyitems(config, items):
                 item.add_marker(skip_integration)
 
 
+@pytest.fixture(name="cache_home", autouse=True, scope="session")
+def fixture_cache_home(tmp_path_factory):
+    """Keeps the caches written by the tests, e.g. the compiled schemas, out of
+    the user's ~/.cache. Worker processes inherit the environment."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        cache_home = tmp_path_factory.mktemp("cache")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+        load_schema_bundle.cache_clear()
+        yield cache_home
+    load_schema_bundle.cache_clear()
+
+
 @pytest.fixture(name="config")
 def fixture_config(request):
     integration_config_file = Path("pytest_config.yaml").resolve()
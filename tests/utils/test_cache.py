@@ -0,0 +1,85 @@
+import pytest
+
+from gregor_anvil_automation.utils import utils
+from gregor_anvil_automation.utils.cache import DiskCache
+from gregor_anvil_automation.utils.columnar import MISSING, ColumnarTable
+from gregor_anvil_automation.utils.utils import parse_input_file
+
+
+@pytest.fixture(name="tsv_file")
+def fixture_tsv_file(tmp_path):
+    file_path = tmp_path / "family.tsv"
+    file_path.write_text("family_id\nBCM_Fam_1\n", encoding="utf-8")
+    return file_path
+
+
+def test_parse_input_file_cached(tsv_file, tmp_path, mocker):
+    """Test that a rerun on an unchanged file does not parse it again"""
+    cache_dir = tmp_path / "cache"
+    tables, _ = parse_input_file(tsv_file, cache_dir=cache_dir)
+    spy = mocker.spy(utils, "parse_uncached_input_file")
+    cached_tables, row_indexes = parse_input_file(tsv_file, cache_dir=cache_dir)
+    spy.assert_not_called()
+    assert cached_tables == tables
+    assert row_indexes["family"].get_rows([2]) == {2: "BCM_Fam_1"}
+
+
+def test_parse_input_file_cache_miss_on_change(tsv_file, tmp_path, mocker):
+    """Test that a changed file is parsed again"""
+    cache_dir = tmp_path / "cache"
+    parse_input_file(tsv_file, cache_dir=cache_dir)
+    tsv_file.write_text("family_id\nBCM_Fam_2\n", encoding="utf-8")
+    spy = mocker.spy(utils, "parse_uncached_input_file")
+    tables, _ = parse_input_file(tsv_file, cache_dir=cache_dir)
+    spy.assert_called_once()
+    assert tables == {"family": [{"family_id": "BCM_Fam_2", "row_number": 2}]}
+
+
+def test_parse_input_file_cache_hit_on_copy(tsv_file, tmp_path, mocker):
+    """Test that a copy of a file in another directory is a cache hit"""
+    cache_dir = tmp_path / "cache"
+    parse_input_file(tsv_file, cache_dir=cache_dir)
+    copy = tmp_path / "staged" / tsv_file.name
+    copy.parent.mkdir()
+    copy.write_bytes(tsv_file.read_bytes())
+    spy = mocker.spy(utils, "parse_uncached_input_file")
+    _, row_indexes = parse_input_file(copy, cache_dir=cache_dir)
+    spy.assert_not_called()
+    assert row_indexes["family"].file_path == copy
+
+
+def test_parsed_input_cache_purge(tsv_file, tmp_path):
+    """Test that purging deletes every entry"""
+    cache_dir = tmp_path / "cache"
+    parse_input_file(tsv_file, cache_dir=cache_dir)
+    cache = DiskCache(cache_dir)
+    assert list(cache_dir.glob("*.pickle"))
+    cache.purge()
+    assert not list(cache_dir.glob("*.pickle"))
+
+
+def test_parsed_input_cache_unreadable_entry(tmp_path):
+    """Test that a corrupt entry is treated as a cache miss"""
+    cache = DiskCache(tmp_path)
+    (tmp_path / "some-key.pickle").write_bytes(b"not a pickle")
+    assert cache.load("some-key") is None
+
+
+def test_disk_cache_keeps_missing_values(tmp_path):
+    """Test that a table with missing cells reads back from the cache with the
+    same cells missing"""
+    table = ColumnarTable.from_samples(
+        [
+            {"family_id": "BCM_Fam_1", "consanguinity": None, "row_number": 2},
+            {"family_id": "BCM_Fam_2", "row_number": 3},
+            {"consanguinity": "Present", "row_number": 4},
+        ]
+    )
+    DiskCache(tmp_path).store("family", {"family": table})
+    cached = DiskCache(tmp_path).load("family")["family"]
+    assert cached == table
+    assert [dict(row) for row in cached] == [dict(row) for row in table]
+    assert cached.column("consanguinity")[1] is MISSING
+    assert "family_id" not in cached[2]
+    del cached[1]["family_id"]
+    assert "family_id" not in cached[1]
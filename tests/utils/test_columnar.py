@@ -0,0 +1,106 @@
+import pickle
+from copy import copy
+
+import pytest
+
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.utils.issue import Issue
+from gregor_anvil_automation.validation.checks import check_uniqueness
+
+
+@pytest.fixture(name="samples")
+def fixture_samples():
+    return [
+        {"family_id": "BCM_Fam_1", "consanguinity": "None suspected", "row_number": 2},
+        {"family_id": "BCM_Fam_2", "consanguinity": "Present", "row_number": 3},
+        {"family_id": "BCM_Fam_1", "row_number": 5},
+    ]
+
+
+@pytest.fixture(name="table")
+def fixture_table(samples):
+    return ColumnarTable.from_samples(samples)
+
+
+def test_columnar_table_rows_match_samples(table, samples):
+    """Test that the rows of the table behave like the samples they came from"""
+    assert len(table) == 3
+    assert table == samples
+    assert [dict(row) for row in table] == samples
+    assert list(table[2]) == ["family_id", "row_number"]
+    assert table[-1]["row_number"] == 5
+    assert table.headers == ["family_id", "consanguinity"]
+
+
+def test_columnar_table_missing_value(table):
+    """Test that a value absent from a row is not the same as an empty one"""
+    row = table[2]
+    assert "consanguinity" not in row
+    assert row.get("consanguinity") is None
+    with pytest.raises(KeyError):
+        row["consanguinity"]  # pylint: disable=pointless-statement
+
+
+def test_columnar_table_row_writes(table):
+    """Test that writing to a row writes to the columns of the table"""
+    table[0]["family_id"] = "BCM_Fam_3"
+    table[1]["notes"] = "new column"
+    assert table.column("family_id")[0] == "BCM_Fam_3"
+    assert table[1]["notes"] == "new column"
+    assert "notes" not in table[0]
+
+
+def test_columnar_table_copy_is_detached(table):
+    """Test that a copied row, like the one cerberus validates, is a plain dict"""
+    document = copy(table[0])
+    document["family_id"] = "changed"
+    assert isinstance(document, dict)
+    assert table[0]["family_id"] == "BCM_Fam_1"
+
+
+def test_columnar_table_rename_column(table):
+    """Test that renaming a column keeps its position"""
+    table.rename_column("family_id", "Family_ID")
+    assert table.headers == ["Family_ID", "consanguinity"]
+    assert table[0]["Family_ID"] == "BCM_Fam_1"
+
+
+def test_columnar_table_project(table):
+    """Test that a projection only keeps the given columns and shares them"""
+    projected = table.project(["family_id", "proband_relationship"])
+    assert projected.headers == ["family_id"]
+    assert projected == [
+        {"family_id": "BCM_Fam_1", "row_number": 2},
+        {"family_id": "BCM_Fam_2", "row_number": 3},
+        {"family_id": "BCM_Fam_1", "row_number": 5},
+    ]
+    assert projected.column("family_id") is table.column("family_id")
+
+
+def test_columnar_table_pickles_missing_values(table, samples):
+    """Test that missing values are still missing once the table is pickled"""
+    unpickled = pickle.loads(pickle.dumps(table))
+    assert unpickled == samples
+    assert "consanguinity" not in unpickled[2]
+
+
+def test_columnar_table_take(table, samples):
+    """Test that taking rows keeps every column in its order"""
+    taken = table.take([2, 0])
+    assert taken.headers == ["family_id", "consanguinity"]
+    assert taken == [samples[2], samples[0]]
+    assert taken.column("family_id") is not table.column("family_id")
+
+
+def test_check_uniqueness_columnar_table(table):
+    """Test that table wide checks run on a columnar table"""
+    issues = []
+    check_uniqueness(table, "family", issues)
+    assert issues == [
+        Issue(
+            "family_id",
+            "The value of family_id has a duplicate in the table family",
+            "family",
+            5,
+        )
+    ]
@@ -0,0 +1,143 @@
+import sqlite3
+from pathlib import Path
+
+import addict
+import pytest
+
+from gregor_anvil_automation.utils.lims import (
+    ConnectionPool,
+    LIMSNotConfigured,
+    get_table_samples_by_lims,
+    iter_query_samples,
+)
+from gregor_anvil_automation.utils.utils import get_table_samples
+
+
+@pytest.fixture(name="lims_dsn")
+def fixture_lims_dsn(tmp_path):
+    db_path = tmp_path / "lims.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "CREATE TABLE participant (participant_id TEXT, family_id TEXT, age INT)"
+        )
+        connection.executemany(
+            "INSERT INTO participant VALUES (?, ?, ?)",
+            [
+                ("BCM_Subject_1_1", " BCM_Fam_1 ", 12),
+                ("BCM_Subject_1_2", None, None),
+                ("BCM_Subject_1_3", "BCM_Fam_1", 30),
+            ],
+        )
+        connection.execute("CREATE TABLE family (family_id TEXT)")
+        connection.execute("INSERT INTO family VALUES ('BCM_Fam_1')")
+    connection.close()
+    return f"sqlite:///{db_path}"
+
+
+@pytest.fixture(name="lims_options")
+def fixture_lims_options():
+    return addict.Dict(
+        batch_size=2,
+        pool_size=2,
+        queries={
+            "participant": "SELECT participant_id, family_id, age AS Age "
+            "FROM participant ORDER BY participant_id",
+            "family": "SELECT family_id FROM family",
+        },
+    )
+
+
+def test_get_table_samples_by_lims(lims_dsn, lims_options, monkeypatch):
+    """Test that LIMS rows become the samples a spreadsheet gives"""
+    monkeypatch.setenv("LIMS_DSN", lims_dsn)
+    tables = get_table_samples(Path("lims:"), addict.Dict(lims=lims_options))
+    assert list(tables) == ["participant", "family"]
+    assert tables["participant"] == [
+        {
+            "participant_id": "BCM_Subject_1_1",
+            "family_id": "BCM_Fam_1",
+            "age": "12",
+            "row_number": 2,
+        },
+        {
+            "participant_id": "BCM_Subject_1_2",
+            "family_id": "",
+            "age": "",
+            "row_number": 3,
+        },
+        {
+            "participant_id": "BCM_Subject_1_3",
+            "family_id": "BCM_Fam_1",
+            "age": "30",
+            "row_number": 4,
+        },
+    ]
+    assert tables["family"] == [{"family_id": "BCM_Fam_1", "row_number": 2}]
+
+
+def test_connection_pool_reuses_connections(lims_dsn, lims_options, mocker):
+    """Test that the pool only opens a connection when none is idle"""
+    connect = mocker.Mock(
+        side_effect=lambda: sqlite3.connect(
+            lims_dsn[len("sqlite:///") :], check_same_thread=False
+        )
+    )
+    pool = ConnectionPool(connect, size=1)
+    get_table_samples_by_lims(lims_options, pool=pool)
+    get_table_samples_by_lims(lims_options, pool=pool)
+    assert connect.call_count == 1
+    pool.close()
+
+
+def test_get_table_samples_by_lims_without_dsn(lims_options, monkeypatch):
+    """Test that a missing DSN is reported"""
+    monkeypatch.delenv("LIMS_DSN", raising=False)
+    with pytest.raises(LIMSNotConfigured):
+        get_table_samples_by_lims(lims_options)
+
+
+class ServerSideCursor:
+    """A cursor that, like a named psycopg2 cursor, only describes the columns
+    of a query once its first rows are fetched"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.description = None
+
+    def execute(self, query):
+        self.cursor.execute(query)
+
+    def fetchmany(self, size):
+        rows = self.cursor.fetchmany(size)
+        self.description = self.cursor.description
+        return rows
+
+    def close(self):
+        self.cursor.close()
+
+
+class ServerSideConnection:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def cursor(self):
+        return ServerSideCursor(self.connection.cursor())
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+
+def test_iter_query_samples_with_server_side_cursor(lims_dsn):
+    """Test that the headers are read once the first rows are fetched"""
+    pool = ConnectionPool(
+        lambda: ServerSideConnection(sqlite3.connect(lims_dsn[len("sqlite:///") :])),
+        size=1,
+    )
+    samples = list(
+        iter_query_samples(pool, "SELECT family_id AS 'Family ID' FROM family", 2)
+    )
+    assert samples == [{"family_id": "BCM_Fam_1", "row_number": 2}]
+    pool.close()
@@ -0,0 +1,213 @@
+"""Checks that every excel and TSV backend reads the same samples"""
+import csv
+from datetime import date, datetime, time
+import gzip
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from gregor_anvil_automation.utils.readers import (
+    get_available_excel_backends,
+    get_excel_reader,
+    pyarrow,
+    to_openpyxl_value,
+)
+from gregor_anvil_automation.utils.row_index import RowIndex
+from gregor_anvil_automation.utils.utils import (
+    ReadOptions,
+    get_table_samples_by_excel,
+    get_table_samples_by_workbook,
+    parse_file,
+    parse_input_stream,
+    read_table,
+)
+
+BACKENDS = get_available_excel_backends()
+
+
+@pytest.fixture(name="typed_file")
+def fixture_typed_file(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "participant"
+    # Data that does not start in column A
+    sheet["C1"], sheet["D1"], sheet["E1"] = "Participant ID", "Age", "Enrolled"
+    sheet["C2"], sheet["D2"], sheet["E2"] = "BCM_Subject_1_1", 12, date(2023, 4, 1)
+    sheet["C3"], sheet["D3"], sheet["E3"] = " BCM_Subject_1_2 ", 30.5, True
+    sheet["C4"], sheet["D4"], sheet["E4"] = "BCM_Subject_1_3", 1e20, time(1, 2)
+    sheet["C6"], sheet["E6"] = "BCM_Subject_1_4", datetime(2023, 4, 1, 12, 30)
+    other = workbook.create_sheet("Family")
+    other.append(["Family ID"])
+    other.append(["BCM_Fam_1"])
+    workbook.active = 1
+    file_path = tmp_path / "typed.xlsx"
+    workbook.save(file_path)
+    return file_path
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_the_same_samples(typed_file, backend):
+    """Test that each backend gives the samples openpyxl gives"""
+    options = ReadOptions(excel_backend=backend)
+    expected = get_table_samples_by_workbook(
+        typed_file, ReadOptions(excel_backend="openpyxl")
+    )
+
+    assert get_table_samples_by_workbook(typed_file, options) == expected
+    assert expected["participant"][0] == {
+        "participant_id": "BCM_Subject_1_1",
+        "age": "12",
+        "enrolled": "2023-04-01 00:00:00",
+        "row_number": 2,
+    }
+
+
+@pytest.fixture(name="error_file")
+def fixture_error_file(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "participant"
+    sheet["B1"], sheet["C1"], sheet["D1"] = "Participant ID", "Age", "Notes"
+    sheet["B2"], sheet["C2"], sheet["D2"] = "BCM_Subject_1_1", "#N/A", "#VALUE!"
+    sheet["B3"], sheet["C3"], sheet["D3"] = "#REF!", 30, "#DIV/0!"
+    sheet["B4"], sheet["C4"] = "BCM_Subject_1_3", 12
+    other = workbook.create_sheet("family")
+    other.append(["Family ID"])
+    other.append(["#NAME?"])
+    file_path = tmp_path / "errors.xlsx"
+    workbook.save(file_path)
+    return file_path
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_error_cells(error_file, backend):
+    """Test that each backend reads error cells as the error text openpyxl
+    gives, from files and from streams"""
+    expected = {
+        "participant": [
+            {
+                "participant_id": "BCM_Subject_1_1",
+                "age": "#N/A",
+                "notes": "#VALUE!",
+                "row_number": 2,
+            },
+            {
+                "participant_id": "#REF!",
+                "age": "30",
+                "notes": "#DIV/0!",
+                "row_number": 3,
+            },
+            {
+                "participant_id": "BCM_Subject_1_3",
+                "age": "12",
+                "notes": "",
+                "row_number": 4,
+            },
+        ],
+        "family": [{"family_id": "#NAME?", "row_number": 2}],
+    }
+    options = ReadOptions(excel_backend=backend)
+
+    assert get_table_samples_by_workbook(error_file, options) == expected
+    stream = io.BytesIO(error_file.read_bytes())
+    assert get_table_samples_by_workbook(stream, options) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_the_active_sheet(typed_file, backend):
+    """Test that each backend reads the active sheet of a single table file"""
+    options = ReadOptions(excel_backend=backend)
+
+    assert get_table_samples_by_excel(typed_file, options) == [
+        {"family_id": "BCM_Fam_1", "row_number": 2}
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_streams(typed_file, backend):
+    """Test that each backend reads a workbook from a binary stream"""
+    stream = io.BytesIO(typed_file.read_bytes())
+
+    assert get_table_samples_by_workbook(
+        stream, ReadOptions(excel_backend=backend)
+    ) == get_table_samples_by_workbook(
+        typed_file, ReadOptions(excel_backend="openpyxl")
+    )
+
+
+def test_get_excel_reader():
+    """Test that auto picks an available backend and unknown ones are refused"""
+    assert get_excel_reader("auto").name in BACKENDS
+    with pytest.raises(ValueError):
+        get_excel_reader("xlrd")
+
+
+def test_to_openpyxl_value():
+    """Test that calamine values are converted to the ones openpyxl reads"""
+    assert to_openpyxl_value("") is None
+    assert to_openpyxl_value(12.0) == 12 and isinstance(to_openpyxl_value(12.0), int)
+    assert to_openpyxl_value(1e20) == 1e20
+    assert to_openpyxl_value(date(2023, 4, 1)) == datetime(2023, 4, 1)
+
+
+TSV_TEXTS = {
+    "plain": "a\tb\n1\t2\n3\t4\n",
+    "strings": "id\tvalue\n001\tNA\n1e5\t\n \ttrue\nnull\tNaN\n",
+    "blank_lines": "a\tb\n\n1\t2\n\n\n3\t4\n\n",
+    "crlf": "a\tb\r\n1\t2\r\n\r\n3\t4\r\n",
+    "no_final_newline": "a\tb\n1\t2",
+    "quotes": 'a\tb\n"x\ty"\t"multi\nline"\nsay ""hi""\ta"b\n',
+    "unicode": "naïve\tb\nÅland\t日本\n",
+    "header_only": "a\tb\n",
+    "empty": "",
+    "short_row": "a\tb\n1\n3\t4\n",
+    "long_row": "a\tb\n1\t2\t3\n",
+    "long_row_then_rows": "a\tb\nx\ty\n1\t2\t3\n4\t5\n6\t7\n",
+    "duplicate_headers": "a\ta\n1\t2\n",
+}
+
+
+@pytest.mark.parametrize("name", TSV_TEXTS)
+def test_read_table_matches_dict_reader(name):
+    """Test that the columnar table has the samples of `csv.DictReader`"""
+    text = TSV_TEXTS[name].replace("\r\n", "\n")
+    table = read_table(io.StringIO(text), "\t")
+    expected = list(csv.DictReader(io.StringIO(text), delimiter="\t"))
+
+    assert len({len(column) for column in table.columns} | {len(table)}) <= 1
+    assert [
+        {key: value for key, value in row.items() if key != "row_number"}
+        for row in table
+    ] == expected
+
+
+@pytest.mark.skipif(pyarrow is None, reason="pyarrow is not installed")
+@pytest.mark.parametrize("name", TSV_TEXTS)
+def test_arrow_tsv_backend_parity(tmp_path, name):
+    """Test that the arrow backend reads the same samples and row offsets"""
+    file_path = tmp_path / f"{name}.tsv"
+    file_path.write_bytes(TSV_TEXTS[name].encode("utf-8"))
+    row_index, arrow_row_index = RowIndex(file_path), RowIndex(file_path)
+
+    samples = parse_file(file_path, "\t", row_index)
+    arrow_samples = parse_file(file_path, "\t", arrow_row_index, "arrow")
+
+    assert arrow_samples == samples
+    assert [dict(row) for row in arrow_samples] == [dict(row) for row in samples]
+    assert arrow_row_index.offsets == row_index.offsets
+
+
+@pytest.mark.skipif(pyarrow is None, reason="pyarrow is not installed")
+@pytest.mark.parametrize("name", ["plain", "quotes", "short_row"])
+def test_arrow_tsv_backend_stream_parity(name):
+    """Test that the arrow backend reads gzipped streams like the csv module"""
+    data = gzip.compress(TSV_TEXTS[name].encode("utf-8"))
+    tables = {
+        backend: parse_input_stream(
+            io.BytesIO(data), f"{name}.tsv.gz", ReadOptions(tsv_backend=backend)
+        )
+        for backend in ["python", "arrow"]
+    }
+
+    assert tables["arrow"] == tables["python"]
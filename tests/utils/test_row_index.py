@@ -0,0 +1,48 @@
+from array import array
+
+import pytest
+
+from gregor_anvil_automation.utils.row_index import RowIndex
+from gregor_anvil_automation.utils.utils import parse_file
+
+
+@pytest.fixture(name="tsv_file")
+def fixture_tsv_file(tmp_path):
+    file_path = tmp_path / "participant.tsv"
+    file_path.write_bytes(
+        b"participant_id\tfamily_id\n"
+        b"BCM_Subject_1_1\tBCM_Fam_1\n"
+        b"\n"
+        b'BCM_Subject_1_2\t"BCM_Fam\n2"\n'
+        b"BCM_Subject_\xc3\xa9_3\tBCM_Fam_3\r\n"
+    )
+    return file_path
+
+
+def test_parse_file_with_row_index(tsv_file):
+    """Test that indexing rows does not change the parsed samples"""
+    row_index = RowIndex(tsv_file)
+    samples = parse_file(tsv_file, "\t", row_index)
+    assert samples == parse_file(tsv_file, "\t")
+    assert [sample["row_number"] for sample in samples] == [2, 3, 4]
+    assert len(row_index.offsets) == len(samples) + 1
+
+
+def test_row_index_get_rows(tsv_file):
+    """Test that only the requested source rows are returned"""
+    row_index = RowIndex(tsv_file)
+    parse_file(tsv_file, "\t", row_index)
+    assert row_index.get_rows([4, 3, 3, 99]) == {
+        3: 'BCM_Subject_1_2\t"BCM_Fam\n2"',
+        4: "BCM_Subject_é_3\tBCM_Fam_3",
+    }
+
+
+def test_row_index_get_rows_empty_file(tmp_path):
+    """Test that an empty file has no rows to return"""
+    file_path = tmp_path / "empty.tsv"
+    file_path.write_bytes(b"")
+    row_index = RowIndex(file_path)
+    assert not parse_file(file_path, "\t", row_index)
+    assert row_index.offsets == array("Q")
+    assert not row_index.get_rows([2])
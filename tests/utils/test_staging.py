@@ -0,0 +1,60 @@
+import addict
+import pytest
+
+from gregor_anvil_automation.utils.staging import (
+    StagingError,
+    copy_verified,
+    stage_and_compare,
+    stage_inputs,
+)
+
+
+@pytest.fixture(name="input_dir")
+def fixture_input_dir(tmp_path):
+    input_dir = tmp_path / "batch"
+    input_dir.mkdir()
+    (input_dir / "family.tsv").write_text("family_id\nBCM_Fam_1\n", encoding="utf-8")
+    (input_dir / "participant.tsv").write_text(
+        "participant_id\nBCM_Subject_1_1\n", encoding="utf-8"
+    )
+    (input_dir / "notes.txt").write_text("not a table", encoding="utf-8")
+    return input_dir
+
+
+def test_stage_inputs_directory(input_dir, tmp_path):
+    """Test that the input files of a directory are copied"""
+    staged_path, _ = stage_inputs(input_dir, tmp_path / "inputs", chunk_size=4)
+    assert staged_path == tmp_path / "inputs"
+    assert sorted(file.name for file in staged_path.iterdir()) == [
+        "family.tsv",
+        "participant.tsv",
+    ]
+    assert (staged_path / "family.tsv").read_bytes() == (
+        input_dir / "family.tsv"
+    ).read_bytes()
+
+
+def test_stage_inputs_file(input_dir, tmp_path):
+    """Test that a single input file is copied"""
+    staged_path, _ = stage_inputs(input_dir / "family.tsv", tmp_path / "inputs")
+    assert staged_path == tmp_path / "inputs" / "family.tsv"
+    assert staged_path.exists()
+
+
+def test_copy_verified_detects_bad_copies(input_dir, tmp_path, mocker):
+    """Test that a copy that does not match what was read is refused"""
+    mocker.patch(
+        "gregor_anvil_automation.utils.staging.fingerprint_file",
+        return_value=(0, "bad-digest"),
+    )
+    with pytest.raises(StagingError):
+        copy_verified(input_dir / "family.tsv", tmp_path / "family.tsv")
+
+
+def test_stage_and_compare_logs_savings(input_dir, tmp_path, caplog):
+    """Test that the comparison with direct reads is logged"""
+    config = addict.Dict(staging={"enabled": True, "compare": True})
+    caplog.set_level("INFO")
+    staged_path = stage_and_compare(input_dir, tmp_path / "inputs", config)
+    assert staged_path == tmp_path / "inputs"
+    assert "Staging Saved" in caplog.text
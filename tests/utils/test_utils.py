@@ -1,12 +1,26 @@
-"""So far only checks generate_file()"""
+"""Checks generate_file() and the table ingestion helpers"""
 from dataclasses import asdict
 import filecmp
+import gzip
 import os
+import shutil
+from zipfile import ZipFile
 
+import addict
 import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font
 
 from gregor_anvil_automation.utils.issue import Issue
-from gregor_anvil_automation.utils.utils import generate_file
+from gregor_anvil_automation.utils.utils import (
+    ReadOptions,
+    generate_file,
+    get_input_files,
+    get_table_samples,
+    get_table_samples_by_directory,
+    get_table_samples_by_excel,
+    get_table_samples_by_workbook,
+)
 
 
 @pytest.fixture(name="valid_table")
@@ -49,6 +63,52 @@ def fixture_valid_issues():
     ]
 
 
+@pytest.fixture(name="excel_file")
+def fixture_excel_file(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Participant ID", " Family ID ", None, "Age"])
+    sheet.append(["BCM_Subject_1_1", "BCM_Fam_1", None, 12])
+    sheet.append([None, "  ", None, None])
+    sheet.append([" BCM_Subject_1_2 ", None, None, 30.5])
+    # Formatting far below the data inflates the declared dimension
+    sheet.cell(row=1_000_000, column=1).font = Font(bold=True)
+    file_path = tmp_path / "participant.xlsx"
+    workbook.save(file_path)
+    return file_path
+
+
+@pytest.fixture(name="submission_file")
+def fixture_submission_file(tmp_path):
+    workbook = Workbook()
+    instructions = workbook.active
+    instructions.title = "Instructions"
+    instructions.append(["Fill in one sheet per table"])
+    aligned = workbook.create_sheet("AlignedShortRead")
+    aligned.append(["aligned_dna_short_read_id", "experiment_dna_short_read_id"])
+    aligned.append(["BCM_BHTEST_A1", "BCM_BHTEST"])
+    participant = workbook.create_sheet("Participant")
+    participant.append(["participant_id"])
+    participant.append(["BCM_Subject_1_1"])
+    file_path = tmp_path / "submission.xlsx"
+    workbook.save(file_path)
+    return file_path
+
+
+@pytest.fixture(name="input_dir")
+def fixture_input_dir(tmp_path, excel_file):
+    input_dir = tmp_path / "batch"
+    input_dir.mkdir()
+    shutil.copy(excel_file, input_dir / "participant.xlsx")
+    (input_dir / "participant.tsv").write_text(
+        "participant_id\tfamily_id\nBCM_Subject_1_1\tBCM_Fam_1\n", encoding="utf-8"
+    )
+    (input_dir / "family.tsv").write_text("family_id\nBCM_Fam_1\n", encoding="utf-8")
+    shutil.copy(input_dir / "family.tsv", input_dir / "family_copy.tsv")
+    (input_dir / "notes.txt").write_text("not a table", encoding="utf-8")
+    return input_dir
+
+
 @pytest.fixture(name="common_file_path")
 def fixture_common_file_path():
     dir_name = os.path.dirname(__file__)
@@ -75,3 +135,141 @@ def test_generate_csv_valid_issues_csv(valid_issues, common_file_path, tmp_path)
     )
 
     assert filecmp.cmp(issues_control, issues_result, shallow=False)
+
+
+def test_get_table_samples_by_excel(excel_file):
+    """Test that samples are read from the real data extent of the sheet"""
+    assert get_table_samples_by_excel(excel_file) == [
+        {
+            "participant_id": "BCM_Subject_1_1",
+            "family_id": "BCM_Fam_1",
+            "age": "12",
+            "row_number": 2,
+        },
+        {
+            "participant_id": "BCM_Subject_1_2",
+            "family_id": "",
+            "age": "30.5",
+            "row_number": 4,
+        },
+    ]
+
+
+def test_get_table_samples_by_excel_stops_after_empty_rows(excel_file):
+    """Test that reading stops after the configured run of empty rows"""
+    samples = get_table_samples_by_excel(excel_file, ReadOptions(max_empty_rows=1))
+    assert [sample["row_number"] for sample in samples] == [2]
+
+
+def test_get_table_samples_by_excel_typed(excel_file):
+    """Test that typed mode keeps the native values of the cells"""
+    samples = get_table_samples_by_excel(excel_file, ReadOptions(typed_excel=True))
+    assert [dict(sample) for sample in samples] == [
+        {
+            "participant_id": "BCM_Subject_1_1",
+            "family_id": "BCM_Fam_1",
+            "age": 12,
+            "row_number": 2,
+        },
+        {
+            "participant_id": "BCM_Subject_1_2",
+            "family_id": "",
+            "age": 30.5,
+            "row_number": 4,
+        },
+    ]
+
+
+def test_get_table_samples_by_workbook(submission_file):
+    """Test that every known sheet is read into its own table"""
+    assert get_table_samples_by_workbook(submission_file) == {
+        "aligned_dna_short_read": [
+            {
+                "aligned_dna_short_read_id": "BCM_BHTEST_A1",
+                "experiment_dna_short_read_id": "BCM_BHTEST",
+                "row_number": 2,
+            }
+        ],
+        "participant": [{"participant_id": "BCM_Subject_1_1", "row_number": 2}],
+    }
+
+
+def test_get_table_samples_by_workbook_single_table(excel_file):
+    """Test that a workbook without known sheets is named after the file"""
+    tables = get_table_samples_by_workbook(excel_file)
+    assert list(tables) == ["participant"]
+    assert tables["participant"] == get_table_samples_by_excel(excel_file)
+
+
+def test_get_input_files_skips_duplicates(input_dir):
+    """Test that the same table sent twice is only parsed once"""
+    assert get_input_files(input_dir) == [
+        input_dir / "family.tsv",
+        input_dir / "participant.tsv",
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_get_table_samples_by_directory(input_dir, workers):
+    """Test that serial and parallel parsing give the same tables"""
+    tables = get_table_samples_by_directory(input_dir, workers=workers)
+    assert list(tables) == ["family", "participant"]
+    assert tables == {
+        "family": [{"family_id": "BCM_Fam_1", "row_number": 2}],
+        "participant": [
+            {
+                "participant_id": "BCM_Subject_1_1",
+                "family_id": "BCM_Fam_1",
+                "row_number": 2,
+            }
+        ],
+    }
+
+
+def test_get_table_samples_projected(input_dir):
+    """Test that only the requested columns of each table are kept"""
+    columns = {"participant": ["participant_id"]}
+    tables = get_table_samples(input_dir, addict.Dict(use_cache=False), columns=columns)
+    assert tables["participant"] == [
+        {"participant_id": "BCM_Subject_1_1", "row_number": 2}
+    ]
+    assert tables["family"].headers == []
+    assert len(tables["family"]) == 1
+
+
+def test_get_table_samples_gzipped_tsv(tmp_path):
+    """Test that gzipped and bgzipped (multi member) TSVs are read as streams"""
+    input_dir = tmp_path / "batch"
+    input_dir.mkdir()
+    with gzip.open(input_dir / "family.tsv.gz", "wt", encoding="utf-8") as fout:
+        fout.write("family_id\nBCM_Fam_1\n")
+    (input_dir / "analyte.tsv.bgz").write_bytes(
+        gzip.compress(b"analyte_id\nBCM_Subject_1_1_A1\n")
+        + gzip.compress(b"BCM_Subject_1_2_A1\n")
+    )
+    tables = get_table_samples(input_dir, addict.Dict(use_cache=False))
+    assert tables == {
+        "analyte": [
+            {"analyte_id": "BCM_Subject_1_1_A1", "row_number": 2},
+            {"analyte_id": "BCM_Subject_1_2_A1", "row_number": 3},
+        ],
+        "family": [{"family_id": "BCM_Fam_1", "row_number": 2}],
+    }
+
+
+def test_get_table_samples_zip(tmp_path, excel_file):
+    """Test that the members of a zip archive are read without extracting them"""
+    zip_path = tmp_path / "batch.zip"
+    with ZipFile(zip_path, "w") as archive:
+        archive.writestr("batch/family.tsv", "family_id\nBCM_Fam_1\n")
+        archive.writestr(
+            "batch/analyte.tsv.gz", gzip.compress(b"analyte_id\nBCM_Subject_1_1_A1\n")
+        )
+        archive.write(excel_file, "batch/participant.xlsx")
+        archive.writestr("__MACOSX/batch/._family.tsv", "resource fork")
+        archive.writestr("batch/README.txt", "not a table")
+    tables = get_table_samples(zip_path, addict.Dict(use_cache=False))
+    assert list(tables) == ["analyte", "family", "participant"]
+    assert tables["family"] == [{"family_id": "BCM_Fam_1", "row_number": 2}]
+    assert tables["analyte"] == [{"analyte_id": "BCM_Subject_1_1_A1", "row_number": 2}]
+    assert tables["participant"] == get_table_samples_by_excel(excel_file)
@@ -0,0 +1,193 @@
+import gzip
+
+import addict
+import pytest
+
+from gregor_anvil_automation.utils.utils import get_table_samples
+from gregor_anvil_automation.utils.vcf import (
+    InvalidVCF,
+    get_variant_type,
+    get_zygosity,
+    iter_vcf_samples,
+)
+
+VCF = """##fileformat=VCFv4.2
+##contig=<ID=chr1,length=248956422,assembly=hg38>
+##INFO=<ID=VARTYPE,Number=1,Type=String,Description="Variant type">
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tBCM_Subject_1_1\tBCM_Subject_1_2
+chr1\t12345\t.\tA\tG\t50\tPASS\tVARTYPE=snv;DB\tGT:AD\t0/1:10,12\t1/1:0,20
+chrX\t999\trs1\tAT\tA\t.\tPASS\t.\tGT\t1\t./.
+chrM\t73\t.\tA\t<DEL>\t.\tPASS\t.\tGT\t0\t1
+"""
+
+VCF_OPTIONS = {
+    "experiment_id": "=experiment_dna_short_read.BCM_1",
+    "gene_known_for_phenotype": "=Candidate",
+}
+
+COLUMNS = {
+    "participant_id": "SAMPLE",
+    "chrom": "CHROM",
+    "pos": "POS",
+    "ref": "REF",
+    "alt": "ALT",
+    "variant_type": "INFO/VARTYPE",
+    "clingen_allele_id": "INFO/DB",
+    "allele_balance_or_heteroplasmy_percentage": "FORMAT/AD",
+    "zygosity": "ZYGOSITY",
+    "variant_reference_assembly": "=GRCh38",
+}
+
+
+def test_iter_vcf_samples():
+    """Test that records are mapped to columns through the sources"""
+    samples = list(iter_vcf_samples(VCF.splitlines(True), COLUMNS, "BCM_Subject_1_2"))
+    assert samples == [
+        {
+            "participant_id": "BCM_Subject_1_2",
+            "chrom": "1",
+            "pos": "12345",
+            "ref": "A",
+            "alt": "G",
+            "variant_type": "snv",
+            "clingen_allele_id": "true",
+            "allele_balance_or_heteroplasmy_percentage": "0,20",
+            "zygosity": "Homozygous",
+            "variant_reference_assembly": "GRCh38",
+            "row_number": 5,
+        },
+        {
+            "participant_id": "BCM_Subject_1_2",
+            "chrom": "X",
+            "pos": "999",
+            "ref": "AT",
+            "alt": "A",
+            "variant_type": "",
+            "clingen_allele_id": "",
+            "allele_balance_or_heteroplasmy_percentage": "",
+            "zygosity": "Unknown",
+            "variant_reference_assembly": "GRCh38",
+            "row_number": 6,
+        },
+        {
+            "participant_id": "BCM_Subject_1_2",
+            "chrom": "MT",
+            "pos": "73",
+            "ref": "A",
+            "alt": "<DEL>",
+            "variant_type": "",
+            "clingen_allele_id": "",
+            "allele_balance_or_heteroplasmy_percentage": "",
+            "zygosity": "Hemizygous",
+            "variant_reference_assembly": "GRCh38",
+            "row_number": 7,
+        },
+    ]
+
+
+def get_finding(row_number, **values):
+    return {
+        "genetic_findings_id": "_".join(
+            ["BCM_Subject_1_1"]
+            + [values[key] for key in ("chrom", "pos", "ref", "alt")]
+        ),
+        "participant_id": "BCM_Subject_1_1",
+        "variant_reference_assembly": "GRCh38",
+        "experiment_id": "experiment_dna_short_read.BCM_1",
+        "gene_known_for_phenotype": "Candidate",
+        **values,
+        "row_number": row_number,
+    }
+
+
+FINDINGS = [
+    get_finding(
+        5,
+        variant_type="SNV",
+        chrom="1",
+        pos="12345",
+        ref="A",
+        alt="G",
+        zygosity="Heterozygous",
+    ),
+    get_finding(
+        6,
+        variant_type="INDEL",
+        chrom="X",
+        pos="999",
+        ref="AT",
+        alt="A",
+        zygosity="Hemizygous",
+    ),
+]
+
+
+def test_get_table_samples_bgzipped_vcf(tmp_path):
+    """Test that a bgzipped VCF is read as the genetic_findings table, without
+    the records where the sample only has reference alleles"""
+    file_path = tmp_path / "findings.vcf.bgz"
+    file_path.write_bytes(gzip.compress(VCF.encode("utf-8")))
+    options = addict.Dict(use_cache=False)
+    options.vcf.columns = VCF_OPTIONS
+    tables = get_table_samples(file_path, options)
+    assert tables == {"genetic_findings": FINDINGS}
+
+
+def test_get_table_samples_vcf_directory(tmp_path):
+    """Test that the records of every VCF of a directory are read, the rows of
+    each VCF numbered after those of the VCFs before it"""
+    (tmp_path / "a.vcf").write_text(VCF, encoding="utf-8")
+    (tmp_path / "b.vcf").write_text(VCF.replace("chr1\t12345", "chr2\t12345"))
+    options = addict.Dict(use_cache=False)
+    options.vcf.columns = VCF_OPTIONS
+    tables = get_table_samples(tmp_path, options)
+    second = {**FINDINGS[0], "chrom": "2", "row_number": 11}
+    second["genetic_findings_id"] = "BCM_Subject_1_1_2_12345_A_G"
+    assert tables == {
+        "genetic_findings": FINDINGS + [second, {**FINDINGS[1], "row_number": 12}]
+    }
+
+
+@pytest.mark.parametrize("tsv_name", ["genetic_findings.tsv", "a.tsv"])
+def test_get_table_samples_vcf_and_tsv_directory(tmp_path, tsv_name):
+    """Test that a table is not read from both a VCF and another file"""
+    (tmp_path / "findings.vcf").write_text(VCF, encoding="utf-8")
+    (tmp_path / tsv_name).write_text("genetic_findings_id\nBCM_1\n")
+    options = addict.Dict(use_cache=False)
+    options.vcf.columns = VCF_OPTIONS
+    if tsv_name == "a.tsv":
+        options.vcf.table_name = "a"
+    with pytest.raises(InvalidVCF, match="only VCFs are read into the same table"):
+        get_table_samples(tmp_path, options)
+
+
+def test_get_table_samples_vcf_without_columns(tmp_path):
+    """Test that required columns that can not be read from the VCF must be
+    given by the config"""
+    file_path = tmp_path / "findings.vcf"
+    file_path.write_text(VCF, encoding="utf-8")
+    with pytest.raises(InvalidVCF, match="experiment_id, gene_known_for_phenotype"):
+        get_table_samples(file_path, addict.Dict(use_cache=False))
+    options = addict.Dict(use_cache=False)
+    options.vcf.columns = VCF_OPTIONS
+    file_path.write_text(VCF.replace("assembly=hg38", ""), encoding="utf-8")
+    with pytest.raises(InvalidVCF, match="reference assembly"):
+        get_table_samples(file_path, options)
+
+
+def test_get_zygosity():
+    """Test that genotypes are read as zygosities"""
+    assert get_zygosity("0|1") == "Heterozygous"
+    assert get_zygosity("1/1") == "Homozygous"
+    assert get_zygosity("1") == "Hemizygous"
+    assert get_zygosity("0/0") == "Reference"
+    assert get_zygosity("./1") == "Unknown"
+    assert get_zygosity("") == "Unknown"
+
+
+def test_get_variant_type():
+    """Test that the variant type is read from the alleles"""
+    assert get_variant_type("A", "G,T") == "SNV"
+    assert get_variant_type("AT", "A") == "INDEL"
+    assert get_variant_type("A", "<DUP>") == "SV"
+    assert get_variant_type("A", "A[2:321682[") == "SV"
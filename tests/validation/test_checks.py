@@ -4,7 +4,11 @@ import addict
 import pytest
 
 from gregor_anvil_automation.utils.issue import Issue
-from gregor_anvil_automation.validation.checks import check_cross_references, check_uniqueness
+from gregor_anvil_automation.validation.checks import (
+    check_cross_references,
+    check_uniqueness,
+    get_key_columns,
+)
 
 
 @pytest.fixture(name="uniqueness_sample_valid_2", scope="function")
@@ -239,4 +243,11 @@ def test_check_cross_table_ref_verify_table_skip():
     ids["participant_id"] = {"test-participant_id-001"}
     valid_tables = {"some-made-up-table": "test-madeup-id-001"}
     check_cross_references(ids, valid_tables, issues)
-    assert not issues
\ No newline at end of file
+    assert not issues
+
+
+def test_get_key_columns():
+    """Test that the key columns are the unique, primary and foreign keys"""
+    assert get_key_columns("participant") == ["participant_id", "family_id", "twin_id"]
+    assert get_key_columns("family") == ["family_id"]
+    assert get_key_columns("phenotype") == ["term_id", "participant_id"]
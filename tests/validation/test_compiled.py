@@ -0,0 +1,194 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.utils.mappings import MULTI_FIELD_MAP
+from gregor_anvil_automation.short_reads.validate import normalize_and_validate_samples
+from gregor_anvil_automation.validation.columnwise import ColumnwiseValidator
+from gregor_anvil_automation.validation.compiled import CompiledValidator
+from gregor_anvil_automation.validation.engines import get_sample_validator
+from gregor_anvil_automation.validation.sample import SampleValidator
+from gregor_anvil_automation.validation.schema import SCHEMAS_DIR, get_schema
+
+TABLE_NAMES = sorted(schema_path.stem for schema_path in SCHEMAS_DIR.glob("*.yaml"))
+
+VALUES = [
+    "",
+    " ",
+    "NA",
+    "na",
+    "0",
+    "2",
+    "12",
+    "1.5",
+    "abc",
+    "Yes",
+    "BCM_",
+    "BCM_Fam_1",
+    "BCM_Subject_1",
+    "BCM_Subject_1_1",
+    "BCM_Subject_1_2",
+    "BCM_Subject_1_3",
+    "BCM_Subject_1_1_A1",
+    "BCM_Subject_1_1_R2",
+    "BCM_Subject_1_1_A9",
+    "BCM_Subject_1_1_A1_A1",
+    "BCM_ONTWGS_BH1_1",
+    "BCM_ONTWGS_BH1_1_A1",
+    "gs://bucket/file.bam",
+    "HP:0001250",
+    "MONDO:0000001",
+    "4/1/23",
+    "04-01-2023",
+    "2023/04/01",
+    "not a date",
+    "99999999999999999999",
+    "a | b",
+    None,
+    5,
+    datetime(2023, 4, 1),
+]
+
+
+def get_candidates(field, rules):
+    """Values of a field that take every branch of its rules"""
+    candidates = list(VALUES)
+    for value in (rules or {}).get("allowed", []):
+        candidates += [value, value.lower(), value.upper(), f" {value}"]
+    for value in MULTI_FIELD_MAP.get(field, []):
+        candidates += [value, f"{value}|{value}", f"{value} | nonsense"]
+    return candidates
+
+
+def generate_samples(schema, count, seed):
+    """Random samples of a schema, some missing fields or with unknown ones"""
+    rng = random.Random(seed)
+    candidates = {
+        field: get_candidates(field, rules) for field, rules in schema.items()
+    }
+    for row_number in range(2, count + 2):
+        sample = {
+            field: rng.choice(values)
+            for field, values in candidates.items()
+            if rng.random() > 0.05
+        }
+        if rng.random() < 0.1:
+            sample["unknown_column"] = "value"
+        sample["row_number"] = row_number
+        yield sample
+
+
+def run_validator(validator, sample):
+    """Returns the normalized document and errors, or the exception raised"""
+    try:
+        validator.validate(sample)
+    except Exception as error:  # pylint: disable=broad-except
+        return type(error), str(error)
+    return list(validator.document.items()), list(validator.errors.items())
+
+
+@pytest.mark.parametrize("table_name", TABLE_NAMES)
+def test_compiled_matches_cerberus(table_name):
+    """Test that the compiled validator gives the very documents and errors of
+    cerberus, in the same order, for random samples of every schema"""
+    schema = get_schema(table_name)
+    for batch_number in (1, 3):
+        cerberus = SampleValidator(schema=schema, batch_number=batch_number)
+        cerberus.allow_unknown = True
+        compiled = CompiledValidator(schema, batch_number)
+        for sample in generate_samples(schema, 150, seed=batch_number):
+            expected = run_validator(cerberus, sample)
+            assert run_validator(compiled, sample) == expected, sample
+
+
+def test_compiled_normalized():
+    """Test that normalizing a document matches cerberus"""
+    schema = get_schema("participant")
+    cerberus = SampleValidator(schema=schema, batch_number=1)
+    cerberus.allow_unknown = True
+    compiled = CompiledValidator(schema, 1)
+    for sample in generate_samples(schema, 100, seed=0):
+        expected = cerberus.normalized(sample, always_return_document=True)
+        assert compiled.normalized(sample, always_return_document=True) == expected
+
+
+def test_unsupported_rule_uses_cerberus():
+    """Test that a schema with a rule that is not compiled is validated by
+    cerberus"""
+    schema = {"field": {"type": "string", "regex": "^a"}}
+    assert isinstance(get_sample_validator(schema, 1, "compiled"), SampleValidator)
+    assert isinstance(
+        get_sample_validator(get_schema("family"), 1, "compiled"), CompiledValidator
+    )
+
+
+def test_normalize_and_validate_samples_engines():
+    """Test that both engines give the same tables and issues"""
+    schema = get_schema("analyte")
+    cerberus = SampleValidator(schema=schema, batch_number=1)
+    cerberus.allow_unknown = True
+    samples = [
+        sample
+        for sample in generate_samples(schema, 100, seed=2)
+        if not isinstance(run_validator(cerberus, sample)[0], type)
+    ]
+    assert samples
+    results = {}
+    for engine in ("cerberus", "compiled"):
+        issues = []
+        table = normalize_and_validate_samples(
+            sample_validator=get_sample_validator(schema, 1, engine),
+            issues=issues,
+            samples=ColumnarTable.from_samples(samples),
+            table_name="analyte",
+        )
+        results[engine] = ([dict(row) for row in table], issues)
+    assert results["compiled"] == results["cerberus"]
+
+
+@pytest.mark.parametrize("table_name", TABLE_NAMES)
+def test_columnwise_matches_cerberus(table_name):
+    """Test that validating a column at a time gives the very tables and
+    issues of cerberus"""
+    schema = get_schema(table_name)
+    cerberus = SampleValidator(schema=schema, batch_number=2)
+    cerberus.allow_unknown = True
+    samples = [
+        sample
+        for sample in generate_samples(schema, 100, seed=4)
+        if not isinstance(run_validator(cerberus, sample)[0], type)
+    ]
+    assert samples
+    results = {}
+    for engine in ("cerberus", "columnwise"):
+        issues = []
+        table = normalize_and_validate_samples(
+            sample_validator=get_sample_validator(schema, 2, engine),
+            issues=issues,
+            samples=ColumnarTable.from_samples(samples),
+            table_name=table_name,
+        )
+        results[engine] = ([list(row.items()) for row in table], issues)
+    assert results["columnwise"] == results["cerberus"]
+
+
+def test_columnwise_validates_distinct_values_once(mocker):
+    """Test that a context free rule runs once per distinct value of a column"""
+    spy = mocker.spy(SampleValidator, "_check_with_must_start_with_bcm_fam")
+    validator = get_sample_validator(get_schema("family"), 1, "columnwise")
+    assert isinstance(validator, ColumnwiseValidator)
+    assert "family_id" in validator.context_free
+    samples = [
+        {"family_id": family_id, "consanguinity": "Unknown", "row_number": idx + 2}
+        for idx, family_id in enumerate(["BCM_Fam_1", "Fam_2", "BCM_Fam_1", "Fam_2"])
+    ]
+    validated = list(validator.validate_table(samples))
+    assert spy.call_count == 2
+    assert [errors for _, errors in validated] == [
+        {},
+        {"family_id": ["Value must start with BCM_Fam"]},
+        {},
+        {"family_id": ["Value must start with BCM_Fam"]},
+    ]
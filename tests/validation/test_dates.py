@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+from dateutil.parser import parse
+
+from gregor_anvil_automation.validation.dates import normalize_date
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "4/1/23",
+        "4-1-2023",
+        "04/01/2023",
+        "2023/04/01",
+        "12/31/75",
+        "12/31/76",
+        "13/4/23",
+        "4/31/23",
+        "April 1, 2023",
+        " 4/1/23",
+        "not a date",
+    ],
+)
+def test_normalize_date_matches_dateutil(value):
+    """Test that the fast path gives what dateutil gives"""
+    try:
+        expected = datetime.strftime(parse(value), "%Y-%m-%d")
+    except ValueError:
+        expected = value
+    assert normalize_date(value) == expected
+
+
+def test_normalize_date_fast_path(mocker):
+    """Test that the usual formats are not parsed by dateutil"""
+    normalize_date.cache_clear()
+    parse_mock = mocker.patch("gregor_anvil_automation.validation.dates.parse")
+    assert normalize_date("4/1/23") == "2023-04-01"
+    assert normalize_date("2023-04-01") == "2023-04-01"
+    parse_mock.assert_not_called()
@@ -0,0 +1,80 @@
+import pytest
+
+from gregor_anvil_automation.validation.ids import (
+    get_id_grammar,
+    parse_aligned_id,
+    parse_batch_suffix,
+    parse_id,
+)
+from gregor_anvil_automation.validation.sample import SampleValidator
+
+
+def test_parse_id():
+    """Test that IDs are taken apart into their parts"""
+    parsed = parse_id("BCM_Subject_12_3_R2")
+    assert (parsed.center, parsed.subject, parsed.member) == ("BCM", "12", "3")
+    assert (parsed.type_letter, parsed.batch) == ("R", 2)
+    assert parsed.family == "BCM_Subject_12_3"
+    assert parse_id("BCM_Subject_12_3").member_number == 3
+    assert parse_id("BCM_Subject_12_3").batch is None
+    assert parse_aligned_id("BCM_Subject_1_1_A1_A2") == ("BCM_Subject_1_1", 2)
+    assert parse_id("BCM_Subject_1_1") is parse_id("BCM_Subject_1_1")
+
+
+@pytest.mark.parametrize(
+    "value,batch_number,expected",
+    [
+        ("BCM_Subject_1_1_A1", 1, True),
+        ("BCM_Subject_1_1_R2", 1, False),
+        ("BCM_Subject_1_1_R2", 2, True),
+        ("BCM_Subject_1_x_A1", 2, False),
+        ("BCM_Subject_1_1", 2, False),
+        ("BCM_Subject_1_1_A1_A1", 2, False),
+        ("HGSC_Subject_1_1_A1", 2, False),
+    ],
+)
+def test_is_analyte_id(value, batch_number, expected):
+    """Test the analyte IDs accepted for a batch"""
+    assert get_id_grammar(batch_number).is_analyte_id(value) is expected
+
+
+def test_participant_and_aligned_ids():
+    """Test the participant and aligned IDs accepted for a batch"""
+    ids = get_id_grammar(2)
+    assert ids.is_participant_id("BCM_Subject_1_1")
+    assert ids.is_participant_id("BCM_Subject_1_x_10")
+    assert not ids.is_participant_id("BCM_Subject_1_")
+    assert ids.is_aligned_id("BCM_Subject_1_1_A1_A2")
+    assert not ids.is_aligned_id("BCM_Subject_1_1_A1_A3")
+    assert ids.is_prefixed_id("BCM_ONTWGS_BH1_1_A1", "BCM_ONTWGS_BH1_1_A")
+    assert not ids.is_prefixed_id("BCM_ONTWGS_BH1_2_A1", "BCM_ONTWGS_BH1_1_A")
+
+
+def test_parse_batch_suffix():
+    """Test that the batch of an analyte ID follows its participant ID"""
+    assert parse_batch_suffix("BCM_Subject_1_1_A3", "BCM_Subject_1_1") == ("A", 3)
+    with pytest.raises(ValueError):
+        parse_batch_suffix("BCM_Subject_1_1_Ax", "BCM_Subject_1_1")
+
+
+def test_checks_use_grammar():
+    """Test that the checks of the validator give the same errors as before"""
+    validator = SampleValidator(
+        schema={
+            "participant_id": {"type": "string", "check_with": "participant_id"},
+            "maternal_id": {"type": "string", "check_with": "maternal_id_is_valid"},
+        },
+        batch_number=1,
+    )
+    assert validator.validate(
+        {"participant_id": "BCM_Subject_1_1", "maternal_id": "BCM_Subject_1_2"}
+    )
+    assert not validator.validate(
+        {"participant_id": "BCM_Subject_1_1", "maternal_id": "BCM_Subject_2_3"}
+    )
+    assert validator.errors == {
+        "maternal_id": [
+            "Field does not contain the same subject as the participant_id",
+            "Value does not end with _2",
+        ]
+    }
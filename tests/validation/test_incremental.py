@@ -0,0 +1,88 @@
+import pytest
+
+from gregor_anvil_automation.short_reads.validate import normalize_and_validate_samples
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.validation.columnwise import ColumnwiseValidator
+from gregor_anvil_automation.validation.engines import get_sample_validator
+from gregor_anvil_automation.validation.incremental import ValidationResults
+from gregor_anvil_automation.validation.sample import SampleValidator
+from gregor_anvil_automation.validation.schema import get_schema
+
+
+@pytest.fixture(name="family_table")
+def fixture_family_table():
+    return ColumnarTable.from_samples(
+        [
+            {"family_id": "BCM_Fam_1", "consanguinity": "present", "row_number": 2},
+            {"family_id": "Fam_2", "consanguinity": "unknown", "row_number": 3},
+        ]
+    )
+
+
+def get_family_validator(engine="cerberus"):
+    return get_sample_validator(get_schema("family"), 1, engine)
+
+
+def validate(table, state_dir, schema_hash="schema-hash", engine="cerberus"):
+    issues = []
+    results = ValidationResults(state_dir, 1, "family", schema_hash)
+    results.load()
+    normalized = normalize_and_validate_samples(
+        get_family_validator(engine), issues, table, "family", results
+    )
+    results.save()
+    return normalized, issues
+
+
+def test_incremental_validation_reuses_unchanged_rows(family_table, tmp_path, mocker):
+    """Test that unchanged rows are not validated again, even if they moved"""
+    expected_issues = []
+    expected = normalize_and_validate_samples(
+        get_family_validator(), expected_issues, family_table, "family"
+    )
+    validate(family_table, tmp_path)
+    moved = ColumnarTable.from_samples(
+        {**sample, "row_number": sample["row_number"] + 1} for sample in family_table
+    )
+    spy = mocker.spy(SampleValidator, "validate")
+    normalized, issues = validate(moved, tmp_path)
+    spy.assert_not_called()
+    assert [dict(row) for row in normalized] == [
+        {**row, "row_number": row["row_number"] + 1} for row in expected
+    ]
+    assert [issue.row for issue in issues] == [
+        issue.row + 1 for issue in expected_issues
+    ]
+
+
+def test_incremental_validation_changed_rows(family_table, tmp_path, mocker):
+    """Test that changed rows, or rows of a changed schema, are validated again"""
+    validate(family_table, tmp_path)
+    family_table[1]["family_id"] = "BCM_Fam_2"
+    spy = mocker.spy(SampleValidator, "validate")
+    _, issues = validate(family_table, tmp_path)
+    assert spy.call_count == 1
+    assert not issues
+    spy.reset_mock()
+    validate(family_table, tmp_path, schema_hash="new-schema-hash")
+    assert spy.call_count == 2
+
+
+def test_incremental_columnwise_validation(family_table, tmp_path, mocker):
+    """Test that the changed rows are validated a column at a time and merged
+    with the reused rows in order"""
+    family_table.append(
+        {"family_id": "BCM_Fam_3", "consanguinity": "none", "row_number": 4}
+    )
+    validate(family_table, tmp_path, engine="columnwise")
+    family_table[0]["family_id"] = "Fam_1"
+    family_table[2]["consanguinity"] = "unknown"
+    expected_issues = []
+    expected = normalize_and_validate_samples(
+        get_family_validator(), expected_issues, family_table, "family"
+    )
+    spy = mocker.spy(ColumnwiseValidator, "validate_row")
+    normalized, issues = validate(family_table, tmp_path, engine="columnwise")
+    assert spy.call_count == 2
+    assert [dict(row) for row in normalized] == [dict(row) for row in expected]
+    assert issues == expected_issues
@@ -0,0 +1,68 @@
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.validation import intern
+from gregor_anvil_automation.validation.intern import (
+    get_intern_tables,
+    intern_table,
+    intern_table_values,
+)
+from gregor_anvil_automation.validation.schema import get_schema
+
+
+def test_get_intern_tables():
+    """Test that only columns with a fixed vocabulary are interned"""
+    intern_tables = get_intern_tables(get_schema("participant"))
+    assert "gregor_center" in intern_tables
+    assert "reported_race" in intern_tables
+    assert "participant_id" not in intern_tables
+    assert intern_tables["consent_code"] == {"GRU": "GRU", "HMB": "HMB"}
+
+
+def test_get_intern_tables_with_several_checks():
+    """Test that a multi value column is interned whatever other checks it has"""
+    schema = get_schema("genetic_findings")
+    assert isinstance(schema["condition_inheritance"]["check_with"], list)
+    intern_tables = get_intern_tables(schema)
+    assert "condition_inheritance" in intern_tables
+    assert "Autosomal recessive" in intern_tables["condition_inheritance"]
+    assert (
+        intern_tables["condition_inheritance"]
+        == get_intern_tables(
+            {"condition_inheritance": {"check_with": "field_with_multi"}}
+        )["condition_inheritance"]
+    )
+
+
+def test_intern_table():
+    """Test that equal values of an interned column become the same object"""
+    table = ColumnarTable.from_samples(
+        {
+            "consent_code": "".join(["G", "R", "U"]),
+            "participant_id": "".join(["BCM_", "Subject_1_1"]),
+            "row_number": row_number,
+        }
+        for row_number in range(2, 6)
+    )
+    intern_tables = get_intern_tables(get_schema("participant"))
+    saved = intern_table(table, intern_tables)
+    consent_codes = table.column("consent_code")
+    assert all(value is intern_tables["consent_code"]["GRU"] for value in consent_codes)
+    assert saved > 0
+    participant_ids = table.column("participant_id")
+    assert participant_ids[0] is not participant_ids[1]
+
+
+def test_intern_table_values_reads_the_schema_once(mocker):
+    """Test that the schema of a table is not copied again for every table"""
+    intern.get_table_intern_tables.cache_clear()
+    spy = mocker.spy(intern, "get_schema")
+    for _ in range(3):
+        table = ColumnarTable.from_samples(
+            [{"consent_code": "".join(["N", "R", "U"]), "row_number": 2}]
+        )
+        intern_table_values("participant", table)
+        assert table.column("consent_code")[0] == "NRU"
+    assert spy.call_count == 1
+    assert intern.get_table_intern_tables("participant")["consent_code"] == {
+        "GRU": "GRU",
+        "HMB": "HMB",
+    }
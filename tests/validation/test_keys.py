@@ -0,0 +1,61 @@
+from gregor_anvil_automation.short_reads.validate import (
+    validate_table_keys,
+    validate_tables,
+)
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.utils.issue import Issue
+from gregor_anvil_automation.utils.utils import project_tables
+from gregor_anvil_automation.validation.checks import get_key_columns
+
+
+def get_tables():
+    return {
+        "family": ColumnarTable.from_samples(
+            [
+                {"family_id": "BCM_Fam_1", "consanguinity": "Present", "row_number": 2},
+                {"family_id": "BCM_Fam_1", "consanguinity": "Present", "row_number": 3},
+            ]
+        ),
+        "participant": ColumnarTable.from_samples(
+            [
+                {
+                    "participant_id": "BCM_Subject_1_1",
+                    "family_id": "BCM_Fam_2",
+                    "twin_id": "NA | BCM_Subject_1_1",
+                    "row_number": 2,
+                }
+            ]
+        ),
+    }
+
+
+def test_validate_table_keys_matches_full_validation():
+    """Test that the keys-only preflight finds the same key issues"""
+    full_issues = []
+    validate_tables(batch_number=1, issues=full_issues, tables=get_tables())
+    tables = get_tables()
+    key_tables = project_tables(
+        tables, {table_name: get_key_columns(table_name) for table_name in tables}
+    )
+    issues = []
+    validate_table_keys(batch_number=1, issues=issues, tables=key_tables)
+    assert issues == [
+        Issue(
+            "family_id",
+            "The value of family_id has a duplicate in the table family",
+            "family",
+            3,
+        ),
+        Issue(
+            "family_id",
+            "Foreign keys does not exist in original table {'BCM_Fam_2'}",
+            "participant",
+            None,
+        ),
+    ]
+    assert all(issue in full_issues for issue in issues)
+    assert key_tables["participant"].headers == [
+        "participant_id",
+        "family_id",
+        "twin_id",
+    ]
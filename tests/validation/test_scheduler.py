@@ -0,0 +1,104 @@
+import time
+from threading import Lock
+
+from addict import Dict
+
+from gregor_anvil_automation.short_reads.validate import validate_tables
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.utils.issue import Issue
+from gregor_anvil_automation.validation.scheduler import (
+    get_reference_dependencies,
+    schedule_tables,
+)
+
+
+def get_tables():
+    return {
+        "participant": ColumnarTable.from_samples(
+            [
+                {
+                    "participant_id": "BCM_Subject_1_1",
+                    "family_id": "BCM_Fam_2",
+                    "twin_id": "NA | BCM_Subject_1_9",
+                    "row_number": 2,
+                },
+                {
+                    "participant_id": "BCM_Subject_1_1",
+                    "family_id": "BCM_Fam_1",
+                    "twin_id": "NA",
+                    "row_number": 3,
+                },
+            ]
+        ),
+        "family": ColumnarTable.from_samples(
+            [{"family_id": "BCM_Fam_1", "consanguinity": "Present", "row_number": 2}]
+        ),
+        "phenotype": ColumnarTable.from_samples(
+            [
+                {
+                    "participant_id": "BCM_Subject_2_1",
+                    "term_id": "HP:0001250",
+                    "row_number": 2,
+                }
+            ]
+        ),
+    }
+
+
+def test_get_reference_dependencies():
+    """Test that a check depends on its table and the source of its key"""
+    assert get_reference_dependencies(["participant", "family"]) == [
+        (("participant", "family_id", "family_id"), {"participant", "family"}),
+        (("participant", "participant_id", "twin_id"), {"participant"}),
+    ]
+    assert get_reference_dependencies(["family"]) == []
+
+
+def test_schedule_tables_checks_after_their_tables():
+    """Test that checks run once their tables are validated and that issues
+    come out in a fixed order whatever order the tables finish in"""
+    delays = {"participant": 0.1, "family": 0.05, "phenotype": 0}
+    events, lock = [], Lock()
+
+    def validate_table(table_name):
+        time.sleep(delays[table_name])
+        with lock:
+            events.append(table_name)
+        return [Issue("field", "message", table_name, 2)]
+
+    def check_reference(reference):
+        with lock:
+            events.append(reference)
+        return [Issue(reference[2], "missing", reference[0], None)]
+
+    issues = schedule_tables(
+        ["participant", "family", "phenotype"], validate_table, check_reference, 3
+    )
+    assert events.index("phenotype") < events.index("participant")
+    for reference, depends_on in get_reference_dependencies(delays):
+        assert all(events.index(name) < events.index(reference) for name in depends_on)
+    assert [(issue.table_name, issue.field) for issue in issues] == [
+        ("participant", "field"),
+        ("family", "field"),
+        ("phenotype", "field"),
+        ("participant", "family_id"),
+        ("participant", "twin_id"),
+        ("phenotype", "participant_id"),
+    ]
+
+
+def test_concurrent_validate_tables_matches_serial():
+    """Test that validating tables concurrently gives the very same issues"""
+    expected, tables = [], get_tables()
+    validate_tables(batch_number=1, issues=expected, tables=tables)
+    assert any(issue.row is None for issue in expected)
+    for workers in (2, 3):
+        issues, concurrent_tables = [], get_tables()
+        validate_tables(
+            batch_number=1,
+            issues=issues,
+            tables=concurrent_tables,
+            options=Dict(workers=workers, chunk_size=1),
+        )
+        assert issues == expected
+        assert concurrent_tables == tables
@@ -0,0 +1,53 @@
+import shutil
+
+import pytest
+import yaml
+
+from gregor_anvil_automation.validation import schema as schema_module
+from gregor_anvil_automation.validation.schema import (
+    SchemaDoesNotExist,
+    get_schema,
+    get_schema_hash,
+    get_schema_path,
+    load_schema_bundle,
+)
+
+
+@pytest.fixture
+def schemas_dir(tmp_path, monkeypatch):
+    """A copy of the schemas with an empty bundle cache"""
+    schemas_dir = tmp_path / "schemas"
+    shutil.copytree(schema_module.SCHEMAS_DIR, schemas_dir)
+    monkeypatch.setattr(schema_module, "SCHEMAS_DIR", schemas_dir)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    load_schema_bundle.cache_clear()
+    yield schemas_dir
+    load_schema_bundle.cache_clear()
+
+
+def test_get_schema_matches_yaml(schemas_dir):
+    """Test that the compiled schemas are the parsed schema files"""
+    for schema_path in schemas_dir.glob("*.yaml"):
+        expected = yaml.safe_load(schema_path.read_text())
+        assert get_schema(schema_path.stem) == expected
+    with pytest.raises(SchemaDoesNotExist):
+        get_schema("not_a_table")
+
+
+def test_get_schema_returns_copies(schemas_dir):
+    """Test that changing a returned schema does not change the bundle"""
+    schema = get_schema("participant")
+    schema.clear()
+    assert get_schema("participant")
+    assert load_schema_bundle() is load_schema_bundle()
+
+
+def test_bundle_invalidated_on_change(schemas_dir):
+    """Test that a changed schema file compiles the bundle again"""
+    old_hash = get_schema_hash("participant")
+    assert (schemas_dir.parent / "cache").exists()
+    schema_path = get_schema_path("participant")
+    schema_path.write_text(schema_path.read_text() + "\nextra_field:\n  type: string\n")
+    load_schema_bundle.cache_clear()
+    assert get_schema_hash("participant") != old_hash
+    assert get_schema("participant")["extra_field"] == {"type": "string"}
@@ -0,0 +1,81 @@
+from addict import Dict
+
+from gregor_anvil_automation.short_reads.validate import validate_tables
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.validation.engines import get_sample_validator
+from gregor_anvil_automation.validation.schema import get_schema
+from gregor_anvil_automation.validation.sharded import (
+    ShardedValidator,
+    get_validation_pool,
+)
+
+PARTICIPANTS = [
+    {
+        "participant_id": "BCM_Subject_1_1",
+        "family_id": "BCM_Fam_1",
+        "paternal_id": "BCM_Subject_1_3",
+        "maternal_id": "BCM_Subject_2_2",
+        "twin_id": "NA",
+        "proband_relationship": "self",
+        "sex": "female",
+    },
+    {
+        "participant_id": "Subject_2_1",
+        "family_id": "BCM_Fam_2",
+        "paternal_id": "0",
+        "maternal_id": "0",
+        "twin_id": "NA",
+        "proband_relationship": "Mother",
+        "sex": "Unknown",
+        "unknown_column": "value",
+    },
+    {
+        "participant_id": "BCM_Subject_3_1",
+        "family_id": "BCM_Fam_3",
+        "paternal_id": "BCM_Subject_3_3",
+        "maternal_id": "0",
+        "twin_id": "BCM_Subject_3_1",
+        "proband_relationship": "Self",
+        "sex": "Male",
+    },
+]
+
+
+def get_tables(count=40):
+    participants = [
+        {**PARTICIPANTS[idx % len(PARTICIPANTS)], "row_number": idx + 2}
+        for idx in range(count)
+    ]
+    for idx, participant in enumerate(participants):
+        participant["participant_id"] += f"{idx}"
+    return {"participant": ColumnarTable.from_samples(participants)}
+
+
+def validate(options):
+    issues, tables = [], get_tables()
+    validate_tables(batch_number=1, issues=issues, tables=tables, options=options)
+    return [list(row.items()) for row in tables["participant"]], issues
+
+
+def test_sharded_validation_matches_serial():
+    """Test that validating in worker processes gives the very tables and
+    issues of validating in this process"""
+    expected = validate(Dict(engine="cerberus"))
+    assert expected[1]
+    for engine in ("cerberus", "columnwise"):
+        assert validate(Dict(engine=engine, workers=2, chunk_size=7)) == expected
+
+
+def test_sharded_validator_keeps_row_order():
+    """Test that the chunks of a table come back in the order of the rows"""
+    samples = [dict(row) for row in get_tables(25)["participant"]]
+    validator = get_sample_validator(get_schema("participant"), 1)
+    expected = []
+    for sample in samples:
+        validator.validate(sample)
+        expected.append((validator.document, validator.errors))
+    with get_validation_pool(1, "cerberus", 3) as pool:
+        sharded = ShardedValidator(pool, "participant", 4)
+        assert list(sharded.validate_table(samples)) == expected
+    with get_validation_pool(1, "cerberus", 1) as pool:
+        assert pool is None
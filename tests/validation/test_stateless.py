@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gregor_anvil_automation.short_reads.validate import convert_errors_to_issues
+from gregor_anvil_automation.validation.sample import SampleValidator
+from gregor_anvil_automation.validation.schema import get_schema
+from gregor_anvil_automation.validation.stateless import (
+    RowValidator,
+    ValidationContext,
+    get_row_validator,
+)
+
+ROWS = [
+    {
+        "participant_id": "BCM_Subject_1_1",
+        "family_id": "BCM_Fam_1",
+        "paternal_id": "BCM_Subject_1_3",
+        "maternal_id": "BCM_Subject_2_2",
+        "twin_id": "NA",
+        "proband_relationship": "self",
+        "sex": "female",
+        "row_number": 2,
+    },
+    {
+        "participant_id": "Subject_2_1",
+        "family_id": "Fam_2",
+        "paternal_id": "0",
+        "maternal_id": "0",
+        "twin_id": "BCM_Subject_2_1",
+        "proband_relationship": "Brother",
+        "sex": None,
+        "unknown_column": "value",
+        "row_number": 3,
+    },
+    {"participant_id": "BCM_Subject_3_1", "family_id": "BCM_Fam_3", "row_number": 4},
+]
+
+
+def validate_with_cerberus(row, batch_number):
+    validator = SampleValidator(
+        schema=get_schema("participant"), batch_number=batch_number
+    )
+    validator.allow_unknown = True
+    validator.validate(row)
+    issues = convert_errors_to_issues(
+        validator.errors, table_name="participant", row=row["row_number"]
+    )
+    return validator.document, issues
+
+
+@pytest.mark.parametrize("batch_number", [1, 2])
+def test_row_validator_matches_cerberus(batch_number):
+    """Test that the rows and issues are those of a `SampleValidator`"""
+    validator = RowValidator(get_schema("participant"))
+    context = ValidationContext(batch_number, "participant")
+    for row in ROWS:
+        assert validator.validate(row, context) == validate_with_cerberus(
+            row, batch_number
+        )
+
+
+def test_row_validator_shared_by_threads():
+    """Test that threads sharing a validator each get the result of their row"""
+    validator = get_row_validator("participant")
+    assert get_row_validator("participant") is validator
+    expected = [validate_with_cerberus(row, 1) for row in ROWS]
+    context = ValidationContext(1, "participant")
+    rows = ROWS * 200
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda row: validator.validate(row, context), rows))
+    assert results == expected * 200
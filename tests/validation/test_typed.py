@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from gregor_anvil_automation.utils.columnar import ColumnarTable
+from gregor_anvil_automation.validation.sample import SampleValidator
+from gregor_anvil_automation.validation.schema import get_schema
+from gregor_anvil_automation.validation.typed import format_table_values
+
+
+def test_format_table_values():
+    """Test that native values are formatted as their schema declares"""
+    table = ColumnarTable.from_samples(
+        [
+            {
+                "read_length": 150.0,
+                "target_insert_size": 350,
+                "date_data_generation": datetime(2023, 4, 1),
+                "experiment_sample_id": 12.5,
+                "row_number": 2,
+            },
+            {
+                "read_length": "NA",
+                "target_insert_size": 350.5,
+                "date_data_generation": "4/1/23",
+                "experiment_sample_id": datetime(2023, 4, 1, 12, 30),
+                "row_number": 3,
+            },
+        ]
+    )
+    formatted = format_table_values(table, get_schema("experiment_dna_short_read"))
+    assert formatted == 6
+    assert [dict(row) for row in table] == [
+        {
+            "read_length": "150",
+            "target_insert_size": "350",
+            "date_data_generation": datetime(2023, 4, 1),
+            "experiment_sample_id": "12.5",
+            "row_number": 2,
+        },
+        {
+            "read_length": "NA",
+            "target_insert_size": "350.5",
+            "date_data_generation": "4/1/23",
+            "experiment_sample_id": "2023-04-01 12:30:00",
+            "row_number": 3,
+        },
+    ]
+
+
+def test_format_table_values_check_with_list():
+    """Test that integer checks are found among several checks of a field"""
+    table = ColumnarTable.from_samples([{"pos": 12345.0, "row_number": 2}])
+    format_table_values(table, get_schema("genetic_findings"))
+    assert table.column("pos") == ["12345"]
+
+
+def test_year_month_date_coerces_dates_directly(mocker):
+    """Test that a native date is formatted without being parsed"""
+    parse = mocker.patch("gregor_anvil_automation.validation.dates.parse")
+    validator = SampleValidator(
+        schema={
+            "date_data_generation": {"type": "string", "coerce": "year_month_date"}
+        },
+        batch_number=1,
+    )
+    assert validator.validate({"date_data_generation": datetime(2023, 4, 1, 12, 30)})
+    assert validator.document == {"date_data_generation": "2023-04-01"}
+    parse.assert_not_called()